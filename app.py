@@ -1,13 +1,23 @@
-import cv2
-import mediapipe as mp
-import numpy as np
-import pickle
+from warmup import LazyModule, WarmUp, since_start
+from forest import load_model
+from features import FeatureExtractor
+from prediction_cache import PredictionCache
+from sentence import HandDecoders, SentenceBuilder
 import customtkinter as ctk
-from PIL import Image
-import pyttsx3
+from PIL import Image, ImageTk
+import numpy as np
 import time
 import os
-import threading
+import collections
+from pipeline import DropOldestQueue, FpsMeter, PipelineStage, SwapBuffers
+from speech import SpeechWorker
+
+# OpenCV and MediaPipe take seconds to import, so the window is shown first and the warm-up
+# thread loads them (capture and hand_tracker import OpenCV themselves)
+cv2 = LazyModule('cv2')
+mp = LazyModule('mediapipe')
+capture = LazyModule('capture')
+hand_tracker = LazyModule('hand_tracker')
 
 # --- MODERN UI DEFINITIONS ---
 BACKGROUND_COLOR = "#242424"
@@ -16,6 +26,16 @@ SECONDARY_COLOR = "#3A3A3A"
 ACCENT_COLOR = "#1F6AA5"
 TEXT_COLOR = "#FFFFFF"
 
+# How often (seconds) the per-stage FPS readout under the video is refreshed
+STATS_REFRESH_INTERVAL = 0.5
+# Size of the video panel; frames are rendered at this size so the GUI never rescales them
+DISPLAY_SIZE = (640, 480)
+# Single words whose rendered audio is kept for replay (needs sounddevice); 0 disables the cache
+SPEECH_CACHE_SIZE = 64
+
+# Result of one classified camera frame, shared between the inference and render stages
+InferenceResult = collections.namedtuple("InferenceResult", ["hand_landmarks", "handedness", "predictions", "probabilities", "label"])
+
 # --- Main App Class ---
 class App(ctk.CTk):
     def __init__(self):
@@ -40,13 +60,40 @@ class App(ctk.CTk):
         # --- App State & Utilities ---
         self.camera_thread = None
         self.model = None
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(static_image_mode=False, max_num_hands=2, min_detection_confidence=0.5)
-        self.mp_draw = mp.solutions.drawing_utils
-        self.current_sentence = ""
-        self.last_prediction = None
-        self.prediction_start_time = None
-        self.prediction_confidence_duration = 1.0
+        self.max_hands = 2
+        # Built by the warm-up thread, so opening only the Learn page never starts MediaPipe
+        self.mp_hands = None
+        self.hand_tracker = None
+        self.mp_draw = None
+        self.landmark_style = None
+        self.connection_style = None
+        self.warm_up = WarmUp([
+            ("Loading OpenCV and MediaPipe", self.import_modules),
+            ("Loading model", self.load_model),
+            ("Starting hand tracker", self.create_hand_tracker),
+        ])
+        self.first_prediction_at = None
+        # One text-to-speech engine for the whole session; its thread imports pyttsx3 itself
+        self.speech = SpeechWorker(cache_size=SPEECH_CACHE_SIZE)
+        self.speak_words = ctk.BooleanVar(value=False)
+        self.sentence = SentenceBuilder()
+        # One streaming decoder per tracked hand, built once the model's classes are known
+        self.hand_decoders = None
+
+        # --- Capture -> Landmark -> Classify -> Render Pipeline ---
+        self.pipeline_stages = []
+        self.prediction_queue = None
+        # Render target: two preallocated RGB frames, one PIL image and one Tk photo, all updated in place
+        self.frame_buffers = None
+        self.frame_image = None
+        self.video_photo = None
+        self.blit_ms = 0.0
+        self.latest_result = None
+        self.feature_extractor = None
+        # Same cache the web server uses; a held sign mostly skips the forest
+        self.prediction_cache = PredictionCache()
+        self.display_meter = FpsMeter()
+        self.last_stats_update = 0.0
 
         # --- Frame Containers & Widget References ---
         self.home_frame = None
@@ -54,9 +101,13 @@ class App(ctk.CTk):
         self.converter_frame = None
         self.start_button = None
         self.video_label = None
+        self.stats_label = None
+        self.status_label = None
 
         self.show_home_page()
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        # Runs once the main loop is up, i.e. right as the window appears
+        self.after(0, self.on_window_shown)
 
     def load_icons(self):
         self.camera_icon = ctk.CTkImage(Image.open("icons/camera.png"), size=(24, 24))
@@ -64,6 +115,51 @@ class App(ctk.CTk):
         self.exit_icon = ctk.CTkImage(Image.open("icons/exit.png"), size=(24, 24))
         self.speak_icon = ctk.CTkImage(Image.open("icons/speak.png"), size=(20, 20))
 
+    # --- Background Warm-Up (imports, model, MediaPipe graphs) ---
+    def on_window_shown(self):
+        print(f"Window shown {since_start():.2f} s after start-up.")
+        self.warm_up.start()
+        self.speech.start()
+        self.check_warm_up()
+
+    def import_modules(self):
+        for module in (cv2, mp, capture, hand_tracker):
+            module.load()
+
+    def load_model(self):
+        self.model = load_model()
+        print("Model loaded.")
+
+    def create_hand_tracker(self):
+        self.mp_hands = mp.solutions.hands
+        # Reuses the last landmarks while the picture does not change; see hand_tracker.py
+        self.hand_tracker = hand_tracker.AdaptiveHandTracker(self.mp_hands.Hands(static_image_mode=False, max_num_hands=self.max_hands, min_detection_confidence=0.5))
+        self.hand_tracker.warm_up()
+        self.mp_draw = mp.solutions.drawing_utils
+        # The render stage draws on the RGB frame, so colors here are in RGB order
+        self.landmark_style = self.mp_draw.DrawingSpec(color=(255, 0, 0), thickness=2, circle_radius=2)
+        self.connection_style = self.mp_draw.DrawingSpec(color=(255, 255, 255), thickness=2)
+
+    def check_warm_up(self):
+        # Polled from the GUI thread; the warm-up thread never touches widgets
+        if not self.warm_up.finished.is_set():
+            self.after(100, self.check_warm_up)
+        self.show_readiness()
+
+    def readiness_text(self):
+        if not self.warm_up.finished.is_set():
+            return f"Warming up: {self.warm_up.status}..."
+        if self.warm_up.error:
+            return f"Error: {self.warm_up.error}"
+        return f"Ready in {self.warm_up.seconds:.1f} s"
+
+    def show_readiness(self):
+        if self.status_label is not None:
+            self.status_label.configure(text=self.readiness_text())
+        if self.start_button is not None and self.camera_thread is None:
+            self.start_button.configure(state="normal" if self.warm_up.ready else "disabled")
+            self.video_label.configure(text="Press 'Start Camera'" if self.warm_up.ready else self.readiness_text())
+
     # --- Page Navigation ---
     def show_frame(self, frame_to_show):
         self.stop_camera_thread()
@@ -81,7 +177,9 @@ class App(ctk.CTk):
             ctk.CTkLabel(self.home_frame, text="ASL Hand Sign Converter", font=self.title_font, text_color=TEXT_COLOR).grid(row=0, column=0, pady=(40, 30), padx=20)
             ctk.CTkButton(self.home_frame, text="Start Converter", image=self.camera_icon, command=self.show_converter_page, font=self.button_font, fg_color=ACCENT_COLOR, hover_color=SECONDARY_COLOR, height=50).grid(row=1, column=0, pady=10, padx=150, sticky="ew")
             ctk.CTkButton(self.home_frame, text="Learn Signs Chart", image=self.book_icon, command=self.show_learn_signs_page, font=self.button_font, fg_color=ACCENT_COLOR, hover_color=SECONDARY_COLOR, height=50).grid(row=2, column=0, pady=10, padx=150, sticky="ew")
-            ctk.CTkButton(self.home_frame, text="Exit", image=self.exit_icon, command=self.on_closing, font=self.button_font, fg_color=SECONDARY_COLOR, hover_color="#C0392B", height=50).grid(row=3, column=0, pady=(30, 40), padx=150, sticky="ew")
+            ctk.CTkButton(self.home_frame, text="Exit", image=self.exit_icon, command=self.on_closing, font=self.button_font, fg_color=SECONDARY_COLOR, hover_color="#C0392B", height=50).grid(row=3, column=0, pady=(30, 10), padx=150, sticky="ew")
+            self.status_label = ctk.CTkLabel(self.home_frame, text=self.readiness_text(), font=self.textbox_font, text_color=TEXT_COLOR)
+            self.status_label.grid(row=4, column=0, pady=(0, 40), padx=20)
         self.show_frame(self.home_frame)
 
     # --- Learn Signs Page ---
@@ -105,7 +203,6 @@ class App(ctk.CTk):
 
     # --- Converter Page ---
     def show_converter_page(self):
-        self.load_model()
         if not self.converter_frame:
             self.converter_frame = ctk.CTkFrame(self, fg_color="transparent")
             self.converter_frame.grid_columnconfigure(0, weight=2)
@@ -120,6 +217,8 @@ class App(ctk.CTk):
             self.video_label.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
             self.start_button = ctk.CTkButton(camera_sub_frame, text="Start Camera", command=self.toggle_camera, font=self.button_font, fg_color=ACCENT_COLOR, hover_color=SECONDARY_COLOR)
             self.start_button.grid(row=1, column=0, padx=10, pady=10, sticky="ew")
+            self.stats_label = ctk.CTkLabel(camera_sub_frame, text="", font=self.textbox_font, text_color=TEXT_COLOR)
+            self.stats_label.grid(row=2, column=0, padx=10, pady=(0, 10), sticky="w")
             # Controls Frame
             controls_sub_frame = ctk.CTkFrame(self.converter_frame, fg_color=PRIMARY_COLOR, corner_radius=10)
             controls_sub_frame.grid(row=0, column=1, padx=(5, 10), pady=10, sticky="nsew")
@@ -136,17 +235,11 @@ class App(ctk.CTk):
             ctk.CTkButton(button_grid, text="Space", command=self.add_space, fg_color=SECONDARY_COLOR, hover_color=ACCENT_COLOR).grid(row=0, column=0, padx=5, pady=5, sticky="ew")
             ctk.CTkButton(button_grid, text="Backspace", command=self.backspace, fg_color=SECONDARY_COLOR, hover_color=ACCENT_COLOR).grid(row=0, column=1, padx=5, pady=5, sticky="ew")
             ctk.CTkButton(button_grid, text="Clear", command=self.clear_text, fg_color=SECONDARY_COLOR, hover_color=ACCENT_COLOR).grid(row=0, column=2, padx=5, pady=5, sticky="ew")
-            self.speak_button = ctk.CTkButton(controls_sub_frame, text="Speak Text", image=self.speak_icon, command=self.start_speak_thread, font=self.button_font, fg_color=ACCENT_COLOR, hover_color=SECONDARY_COLOR)
+            self.speak_button = ctk.CTkButton(controls_sub_frame, text="Speak Text", image=self.speak_icon, command=self.speak_text, font=self.button_font, fg_color=ACCENT_COLOR, hover_color=SECONDARY_COLOR)
             self.speak_button.grid(row=4, column=0, padx=10, pady=10, sticky="ew")
+            ctk.CTkSwitch(controls_sub_frame, text="Speak each word", variable=self.speak_words, font=self.textbox_font, progress_color=ACCENT_COLOR).grid(row=5, column=0, padx=10, pady=(0, 10), sticky="w")
         self.show_frame(self.converter_frame)
-
-    def load_model(self):
-        if not self.model:
-            try:
-                with open('model.pkl', 'rb') as f: self.model = pickle.load(f)
-                print("Model loaded.")
-            except FileNotFoundError: print("Error: model.pkl not found.")
-            except Exception as e: print(f"Error loading model: {e}")
+        self.show_readiness()
 
     # --- Thread-Safe Camera Control ---
     def toggle_camera(self):
@@ -157,11 +250,35 @@ class App(ctk.CTk):
 
     def start_camera_thread(self):
         if self.camera_thread is None:
-            if not self.model:
-                self.video_label.configure(text="Error: Model not loaded.")
+            if not self.warm_up.ready:
+                self.video_label.configure(text=self.readiness_text())
                 return
             self.video_label.configure(text="") 
-            self.camera_thread = CameraThread(self)
+            # Every hand-off is a bounded drop-oldest queue, so a slow stage only ever sees the newest input
+            landmark_inbox = DropOldestQueue(maxsize=1)
+            classify_inbox = DropOldestQueue(maxsize=1)
+            render_inbox = DropOldestQueue(maxsize=1)
+            width, height = DISPLAY_SIZE
+            self.frame_buffers = SwapBuffers((height, width, 3))
+            # Pillow copies RGB data in Image.frombuffer, so a view of the buffers would be a frozen
+            # snapshot; the published buffer is copied into this image right before each paste instead
+            self.frame_image = Image.new("RGB", DISPLAY_SIZE)
+            self.video_photo = ImageTk.PhotoImage("RGB", DISPLAY_SIZE)
+            self.video_label.configure(image=self.video_photo)
+            self.prediction_queue = DropOldestQueue(maxsize=32)
+            self.latest_result = InferenceResult([], [], [], [], "No Hand Detected")
+            self.hand_decoders = HandDecoders(self.model.classes_)
+            # Only the classify stage uses the extractor, so its reused buffers are never shared
+            self.feature_extractor = FeatureExtractor(self.model.feature_schema, max_hands=self.max_hands)
+            self.pipeline_stages = [
+                PipelineStage("Landmarks", self.detect_landmarks, landmark_inbox, [classify_inbox]),
+                PipelineStage("Classify", self.classify_landmarks, classify_inbox, [self.prediction_queue]),
+                PipelineStage("Render", self.render_frame, render_inbox),
+            ]
+            for stage in self.pipeline_stages:
+                stage.start()
+            # The camera feeds inference and display independently, so the display keeps camera rate
+            self.camera_thread = capture.CaptureStream(capture.parse_source(capture.CAMERA_SOURCE, name="camera"), [landmark_inbox, render_inbox])
             self.camera_thread.start()
             self.start_button.configure(text="Stop Camera")
             self.update_gui_feed()
@@ -171,120 +288,131 @@ class App(ctk.CTk):
             self.camera_thread.stop()
             self.camera_thread.join()
             self.camera_thread = None
+        for stage in self.pipeline_stages:
+            stage.stop()
+        for stage in self.pipeline_stages:
+            stage.join()
+        self.pipeline_stages = []
         if self.start_button is not None:
             self.start_button.configure(text="Start Camera")
         if self.video_label is not None:
-            self.video_label.configure(image=None, text="Camera Off")
+            self.video_label.configure(image=None, text="Camera Off" if self.warm_up.ready else self.readiness_text())
+
+    # --- Pipeline Stages (run on worker threads, never touch Tk widgets) ---
+    def detect_landmarks(self, rgb_frame):
+        return self.hand_tracker.process(rgb_frame)
+
+    def classify_landmarks(self, tracked_hands):
+        hand_landmarks_list, handedness = tracked_hands
+        predictions = []
+        probabilities = []
+        label = "No Hand Detected"
+        try:
+            if hand_landmarks_list:
+                # All detected hands are classified in one batched call, minus cache hits
+                features = self.feature_extractor.extract(hand_landmarks_list)
+                probabilities = self.prediction_cache.predict_proba(self.model, features)
+                predictions = list(self.model.classes_[probabilities.argmax(axis=1)])
+                label = f"Prediction: {predictions[-1].upper()}"
+        except Exception:
+            label = "Processing Error"
+        result = InferenceResult(hand_landmarks_list, handedness, predictions, probabilities, label)
+        self.latest_result = result
+        return result
+
+    def render_frame(self, rgb_frame):
+        # Overlay the most recent inference result on the newest camera frame. The camera frame is
+        # also being read by MediaPipe, so it is copied (or resized) into the back buffer first.
+        result = self.latest_result
+        target = self.frame_buffers.back()
+        if rgb_frame.shape == target.shape:
+            np.copyto(target, rgb_frame)
+        else:
+            cv2.resize(rgb_frame, DISPLAY_SIZE, dst=target, interpolation=cv2.INTER_AREA)
+        for hand_landmarks in result.hand_landmarks:
+            self.mp_draw.draw_landmarks(target, hand_landmarks, self.mp_hands.HAND_CONNECTIONS, self.landmark_style, self.connection_style)
+        cv2.putText(target, result.label, (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
+        self.frame_buffers.publish()
 
+    # --- GUI Side: only blits finished frames and applies predictions ---
     def update_gui_feed(self):
-        if self.camera_thread and self.camera_thread.is_running and self.camera_thread.frame is not None:
-            frame = self.camera_thread.frame
-            prediction = "No Hand Detected"
-            try:
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = self.hands.process(rgb_frame)
-                if results.multi_hand_landmarks:
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        self.mp_draw.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
-                        landmarks = []
-                        base_x, base_y = hand_landmarks.landmark[0].x, hand_landmarks.landmark[0].y
-                        for lm in hand_landmarks.landmark:
-                            landmarks.extend([lm.x - base_x, lm.y - base_y])
-                        pred = self.model.predict(np.array(landmarks).reshape(1, -1))[0]
-                        prediction = f"Prediction: {pred.upper()}"
-                        self.update_sentence(pred)
-                else:
-                    self.last_prediction = None
-            except Exception:
-                prediction = "Processing Error"
-            
-            cv2.putText(frame, prediction, (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
-            img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-            img_tk = ctk.CTkImage(light_image=img, dark_image=img, size=(640, 480))
-            if self.video_label:
-                self.video_label.image = img_tk
-                self.video_label.configure(image=img_tk)
-        
-        if self.camera_thread and self.camera_thread.is_running:
-            self.after(20, self.update_gui_feed)
+        if self.camera_thread is None or not self.camera_thread.is_alive():
+            return
+
+        for result in self.prediction_queue.drain():
+            if self.first_prediction_at is None and result.predictions:
+                self.first_prediction_at = since_start()
+                print(f"First prediction {self.first_prediction_at:.2f} s after start-up.")
+            self.update_sentence(result)
+
+        with self.frame_buffers.read() as index:
+            if index is not None:
+                started = time.perf_counter()
+                self.frame_image.frombytes(self.frame_buffers.buffers[index])
+                self.video_photo.paste(self.frame_image)
+                # Smoothed per-frame cost of getting a finished frame on screen
+                self.blit_ms = 0.9 * self.blit_ms + 0.1 * (time.perf_counter() - started) * 1000.0
+                self.display_meter.tick()
+
+        now = time.time()
+        if now - self.last_stats_update >= STATS_REFRESH_INTERVAL:
+            self.last_stats_update = now
+            self.update_stats_label()
+
+        self.after(10, self.update_gui_feed)
+
+    def update_stats_label(self):
+        rates = [f"Capture {self.camera_thread.meter.fps:.0f} ({self.camera_thread.dropped} dropped)"]
+        rates += [f"{stage.name} {stage.meter.fps:.0f}" for stage in self.pipeline_stages]
+        rates.append(f"Display {self.display_meter.fps:.0f}")
+        tracking = self.hand_tracker.stats()
+        rates.append(f"Skipped {tracking['skipped']:.0%}")
+        rates.append(f"Cache hits {self.prediction_cache.stats()['hit_rate']:.0%}")
+        rates.append(f"Blit {self.blit_ms:.1f} ms")
+        if self.stats_label is not None:
+            self.stats_label.configure(text="FPS  " + " | ".join(rates))
 
     # --- Text and Speech Logic ---
-    def update_sentence(self, prediction):
-        if not prediction: return
-        if prediction == self.last_prediction:
-            if (time.time() - self.prediction_start_time) >= self.prediction_confidence_duration:
-                if not self.current_sentence or self.current_sentence[-1].lower() != prediction.lower():
-                    self.current_sentence += prediction
-                    self.output_textbox.insert(ctk.END, prediction.upper())
-                self.last_prediction = None
-        else:
-            self.last_prediction = prediction
-            self.prediction_start_time = time.time()
+    def update_sentence(self, result):
+        # Every classified frame counts towards a commit; each hand is decoded on its own and
+        # only the primary hand writes, see HandDecoders
+        letter = self.hand_decoders.update(result.handedness, result.probabilities)
+        if letter:
+            self.sentence.append(letter)
+            self.output_textbox.insert(ctk.END, letter.upper())
             
     def add_space(self):
-        if not self.current_sentence or self.current_sentence[-1] != ' ':
-            self.current_sentence += " "
+        if self.sentence.add_space():
             self.output_textbox.insert(ctk.END, " ")
+            # A space finishes the word, so it can be spoken while the next one is signed
+            if self.speak_words.get():
+                self.speech.speak(self.sentence.last_word())
 
     def backspace(self):
-        if self.current_sentence:
-            self.current_sentence = self.current_sentence[:-1]
+        if self.sentence.backspace():
             self.output_textbox.delete("end-2c", "end-1c")
 
     def clear_text(self):
-        self.current_sentence = ""
+        self.sentence.clear()
         self.output_textbox.delete("1.0", ctk.END)
     
-    def start_speak_thread(self):
-        text_to_speak = self.output_textbox.get("1.0", ctk.END).strip()
-        if text_to_speak:
+    def speak_text(self):
+        if self.speech.speak(self.output_textbox.get("1.0", ctk.END)):
             self.speak_button.configure(state="disabled", text="Speaking...")
-            speak_thread = threading.Thread(target=self.speak_text, args=(text_to_speak,), daemon=True)
-            speak_thread.start()
+            self.check_speech()
 
-    def speak_text(self, text):
-        try:
-            engine = pyttsx3.init()
-            engine.say(text)
-            engine.runAndWait()
-        except Exception as e:
-            print(f"Error in text-to-speech: {e}")
-        finally:
+    def check_speech(self):
+        # Polled from the GUI thread; the speech worker never touches widgets
+        if self.speech.busy:
+            self.after(100, self.check_speech)
+        else:
             self.speak_button.configure(state="normal", text="Speak Text")
 
     def on_closing(self):
         self.stop_camera_thread()
+        self.speech.stop()
         self.destroy()
 
-# --- Dedicated Camera Thread Class ---
-class CameraThread(threading.Thread):
-    def __init__(self, app_instance):
-        super().__init__(daemon=True)
-        self.app = app_instance
-        self.is_running = False
-        self.frame = None
-        self.cap = None
-
-    def run(self):
-        self.is_running = True
-        self.cap = cv2.VideoCapture(1)
-        if not self.cap.isOpened():
-            print("Error: CameraThread could not open camera.")
-            self.is_running = False
-            return
-
-        while self.is_running:
-            ret, frame = self.cap.read()
-            if not ret:
-                break
-            self.frame = cv2.flip(frame, 1)
-        
-        self.cap.release()
-        print("CameraThread finished.")
-
-    def stop(self):
-        self.is_running = False
-
 if __name__ == "__main__":
     app = App()
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,132 @@
+import collections
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+# --- Micro-Batching Prediction Engine ---
+class MicroBatcher:
+    """
+    Collects feature vectors from concurrent callers and classifies them together.
+
+    A batch is closed when it holds `max_batch_size` rows or when the oldest row has waited
+    `max_wait_ms`, whichever comes first. One vectorized `predict_proba` call then serves the
+    whole batch and each caller receives its own row of probabilities.
+
+    With a `PredictionCache`, `predict` answers cache hits directly and only misses are batched.
+    """
+
+    def __init__(self, model, max_batch_size=32, max_wait_ms=5.0, latency_window=1000, cache=None):
+        self.model = model
+        self.cache = cache
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._pending = collections.deque()
+        self._cond = threading.Condition()
+        self._stats_lock = threading.Lock()
+        self._latencies = collections.deque(maxlen=latency_window)
+        self._requests = 0
+        self._batches = 0
+        self._full_batches = 0
+        self._rows_batched = 0
+        self._inference_time = 0.0
+        self._is_running = True
+        self._worker = threading.Thread(target=self._run, name="MicroBatcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, features):
+        """Queues one feature vector and returns a Future resolving to its class-probability row."""
+        future = Future()
+        # Copied, since callers may reuse their feature buffers before the batch runs
+        row = np.array(features, dtype=np.float32).reshape(-1)
+        with self._cond:
+            self._pending.append((row, future, time.perf_counter()))
+            self._cond.notify()
+        return future
+
+    def predict_proba(self, features, timeout=None):
+        """Blocking helper: returns the class-probability row for one feature vector."""
+        proba = self.cache.lookup(features) if self.cache is not None else None
+        if proba is None:
+            proba = self.submit(features).result(timeout)
+            if self.cache is not None:
+                self.cache.store(features, proba)
+        return proba
+
+    def predict(self, features, timeout=None):
+        """Blocking helper: returns (label, probability) for one feature vector."""
+        proba = self.predict_proba(features, timeout)
+        best = int(np.argmax(proba))
+        return self.model.classes_[best], float(proba[best])
+
+    def stop(self):
+        with self._cond:
+            self._is_running = False
+            self._cond.notify_all()
+        self._worker.join()
+
+    def _collect_batch(self):
+        with self._cond:
+            while self._is_running and not self._pending:
+                self._cond.wait()
+            if not self._pending:
+                return []
+            deadline = self._pending[0][2] + self.max_wait
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or not self._is_running:
+                    break
+                self._cond.wait(remaining)
+            count = min(len(self._pending), self.max_batch_size)
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _run(self):
+        while self._is_running or self._pending:
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            started = time.perf_counter()
+            try:
+                probabilities = self.model.predict_proba(np.vstack([row for row, _, _ in batch]))
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            finished = time.perf_counter()
+            for (_, future, _), proba in zip(batch, probabilities):
+                future.set_result(proba)
+            self._record(batch, finished - started, finished)
+
+    def _record(self, batch, inference_time, finished):
+        with self._stats_lock:
+            self._requests += len(batch)
+            self._batches += 1
+            self._rows_batched += len(batch)
+            self._inference_time += inference_time
+            if len(batch) == self.max_batch_size:
+                self._full_batches += 1
+            self._latencies.extend(finished - submitted for _, _, submitted in batch)
+
+    # --- Statistics ---
+    def stats(self):
+        with self._stats_lock:
+            latencies_ms = np.array(self._latencies) * 1000.0
+            batches = max(self._batches, 1)
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'requests': self._requests,
+                'batches': self._batches,
+                'pending': len(self._pending),
+                'mean_batch_size': self._rows_batched / batches,
+                # Share of batches that filled up before the deadline expired
+                'full_batch_rate': self._full_batches / batches,
+                'mean_inference_ms': self._inference_time * 1000.0 / batches,
+                'latency_ms': {
+                    'p50': float(np.percentile(latencies_ms, 50)) if latencies_ms.size else 0.0,
+                    'p95': float(np.percentile(latencies_ms, 95)) if latencies_ms.size else 0.0,
+                    'p99': float(np.percentile(latencies_ms, 99)) if latencies_ms.size else 0.0,
+                },
+            }
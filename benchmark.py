@@ -0,0 +1,278 @@
+import argparse
+import base64
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tkinter
+import tracemalloc
+
+import cv2
+import mediapipe as mp
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+from PIL import Image, ImageTk
+
+from features import NUM_LANDMARKS, FeatureExtractor, feature_size
+from forest import CompiledForest, load_model
+from hand_tracker import AdaptiveHandTracker
+from landmark_store import MANIFEST_NAME, LandmarkStore
+
+STAGES = ('decode', 'color', 'landmarks', 'tracking', 'features', 'classify', 'render', 'blit', 'end_to_end')
+
+# --- Reproducible Inputs ---
+def load_frames(frames_dir, video, count, seed):
+    """BGR frames from an image folder or a video, or seeded synthetic 640x480 frames."""
+    frames = []
+    if frames_dir:
+        for name in sorted(os.listdir(frames_dir)):
+            frame = cv2.imread(os.path.join(frames_dir, name))
+            if frame is not None:
+                frames.append(frame)
+            if len(frames) == count:
+                break
+    elif video:
+        cap = cv2.VideoCapture(video)
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+    else:
+        rng = np.random.default_rng(seed)
+        for _ in range(count):
+            frame = rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)
+            cv2.circle(frame, (int(rng.integers(160, 480)), int(rng.integers(120, 360))), 80, (60, 120, 200), -1)
+            frames.append(frame)
+    if not frames:
+        raise SystemExit("Error: no benchmark frames could be loaded.")
+    return frames
+
+
+def make_hands(count, seed):
+    """Seeded synthetic MediaPipe hands, so the feature/classify/render stages never depend on detection."""
+    rng = np.random.default_rng(seed)
+    hands = []
+    for _ in range(count):
+        wrist = rng.uniform(0.3, 0.7, 2)
+        hand = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in np.column_stack([wrist + rng.normal(0, 0.08, (NUM_LANDMARKS, 2)), rng.normal(0, 0.02, NUM_LANDMARKS)]):
+            hand.landmark.add(x=float(x), y=float(y), z=float(z))
+        hands.append(hand)
+    return hands
+
+
+def load_vectors(store_dir, data_file, count, feature_schema, seed):
+    """
+    Landmark feature rows from the dataset store (a seeded sample), else from a legacy dataset
+    CSV, otherwise seeded random rows. Store rows are only used if they match the model's schema.
+    """
+    size = feature_size(feature_schema)
+    if store_dir and os.path.exists(os.path.join(store_dir, MANIFEST_NAME)):
+        store = LandmarkStore.open(store_dir)
+        if store.feature_schema == feature_schema and len(store):
+            X, _, _ = store.read()
+            rows = np.random.default_rng(seed).choice(len(X), min(count, len(X)), replace=False)
+            return X[np.sort(rows)]
+        print(f"Warning: store '{store_dir}' is empty or has schema '{store.feature_schema}', not '{feature_schema}'.")
+    if data_file and os.path.exists(data_file) and os.path.getsize(data_file) > 0:
+        rows = np.loadtxt(data_file, delimiter=',', usecols=range(1, size + 1), dtype=np.float32, max_rows=count)
+        if len(rows):
+            return np.atleast_2d(rows)
+    print("Warning: no landmark dataset found, the classify stage uses random vectors.")
+    return np.random.default_rng(seed).normal(0, 0.1, (count, size)).astype(np.float32)
+
+
+# --- Measurement ---
+def measure(func, items, repeats):
+    """Runs func over every item `repeats` times; returns per-call latency percentiles, throughput and memory."""
+    for item in items[:min(len(items), 5)]:
+        func(item)  # warm-up (lazy initialization, caches)
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for item in items:
+            t0 = time.perf_counter()
+            func(item)
+            latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    # Memory is traced on a separate pass, since tracemalloc itself slows allocations down
+    tracemalloc.start()
+    for item in items:
+        func(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    latencies_ms = np.array(latencies) * 1000.0
+    return {
+        'calls': len(latencies),
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p95_ms': float(np.percentile(latencies_ms, 95)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'mean_ms': float(latencies_ms.mean()),
+        'throughput_per_s': len(latencies) / elapsed,
+        'peak_python_mb': peak / 2**20,
+    }
+
+
+# --- Stage Definitions ---
+def build_stages(model, frames, hands, vectors):
+    jpegs = [base64.b64encode(cv2.imencode('.jpg', frame)[1]).decode('ascii') for frame in frames]
+    rgb_frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+    tracker = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=2, min_detection_confidence=0.5)
+    # Same detector settings behind the app's frame-skipping scheduler
+    adaptive = AdaptiveHandTracker(mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=2, min_detection_confidence=0.5))
+    extractor = FeatureExtractor(model.feature_schema, max_hands=2)
+    mp_draw = mp.solutions.drawing_utils
+    connections = mp.solutions.hands.HAND_CONNECTIONS
+
+    def decode(data):
+        return cv2.imdecode(np.frombuffer(base64.b64decode(data), np.uint8), cv2.IMREAD_COLOR)
+
+    display = np.zeros((480, 640, 3), dtype=np.uint8)
+    display_image = Image.new("RGB", (640, 480))
+    photo = make_photo((640, 480))
+
+    def render(pair):
+        # Mirrors App.render_frame: copy the RGB camera frame into the preallocated display
+        # buffer and draw the overlay there
+        rgb_frame, hand = pair
+        if rgb_frame.shape == display.shape:
+            np.copyto(display, rgb_frame)
+        else:
+            cv2.resize(rgb_frame, (640, 480), dst=display, interpolation=cv2.INTER_AREA)
+        mp_draw.draw_landmarks(display, hand, connections)
+        cv2.putText(display, "Prediction: A", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
+        return display
+
+    def blit(rendered):
+        # Mirrors App.update_gui_feed: copy the finished buffer into the PIL image and paste it
+        # into the persistent Tk photo (without a display only the PIL copy is timed)
+        display_image.frombytes(rendered)
+        if photo is not None:
+            photo.paste(display_image)
+
+    def end_to_end(data):
+        # The /predict path: base64 JPEG in, label out
+        results = tracker.process(cv2.cvtColor(decode(data), cv2.COLOR_BGR2RGB))
+        if results.multi_hand_landmarks:
+            return model.predict(extractor.extract(results.multi_hand_landmarks))
+        return None
+
+    return {
+        'decode': (decode, jpegs),
+        'color': (lambda frame: cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), frames),
+        'landmarks': (tracker.process, rgb_frames),
+        'tracking': (adaptive.process, rgb_frames),
+        'features': (lambda hand: extractor.extract([hand]), hands),
+        'classify': (lambda row: model.predict(row.reshape(1, -1)), list(vectors)),
+        'render': (render, list(zip(rgb_frames, hands))),
+        'blit': (blit, [cv2.resize(frame, (640, 480)) for frame in rgb_frames]),
+        'end_to_end': (end_to_end, jpegs),
+    }
+
+
+def make_photo(size):
+    """A Tk photo like the app's video panel, or None when there is no display to create one on."""
+    try:
+        root = tkinter.Tk()
+    except tkinter.TclError:
+        print("Warning: no display, the blit stage times the PIL copy but not the Tk paste.")
+        return None
+    root.withdraw()
+    return ImageTk.PhotoImage("RGB", size, master=root)
+
+
+def max_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss / 2**20 if sys.platform == 'darwin' else rss / 1024.0
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# --- Regression Check ---
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = json.load(f)['stages']
+    regressions = []
+    for stage, current in results.items():
+        if stage in baseline and baseline[stage]['p50_ms'] > 0:
+            change = current['p50_ms'] / baseline[stage]['p50_ms'] - 1.0
+            print(f"  {stage:<11} p50 {baseline[stage]['p50_ms']:.3f} -> {current['p50_ms']:.3f} ms ({change:+.1%})")
+            if change > tolerance:
+                regressions.append(stage)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless per-stage latency benchmark (no camera needed).")
+    parser.add_argument('--stages', default=','.join(STAGES), help=f"comma-separated subset of: {', '.join(STAGES)}")
+    parser.add_argument('--frames', help="directory of images to replay (default: synthetic frames)")
+    parser.add_argument('--video', help="video file to replay instead of --frames")
+    parser.add_argument('--store', default='./data/landmarks', help="landmark store with rows for the classify stage")
+    parser.add_argument('--data', default='./data/hand_landmarks.csv', help="legacy CSV of landmark rows, used when there is no store")
+    parser.add_argument('--count', type=int, default=50, help="frames / vectors in the replay set")
+    parser.add_argument('--repeats', type=int, default=5, help="passes over the replay set per stage")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--model', choices=('auto', 'compiled', 'pickle'), default='auto', help="which model file to benchmark")
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help="machine-readable results file")
+    parser.add_argument('--baseline', help="previous results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="p50 slowdown vs. baseline that counts as a regression")
+    args = parser.parse_args()
+
+    if args.model == 'compiled':
+        model = CompiledForest.load('model.npz')
+    elif args.model == 'pickle':
+        model = load_model(compiled_path=None)
+    else:
+        model = load_model()
+
+    frames = load_frames(args.frames, args.video, args.count, args.seed)
+    hands = make_hands(len(frames), args.seed)
+    vectors = load_vectors(args.store, args.data, args.count, model.feature_schema, args.seed)
+    stages = build_stages(model, frames, hands, vectors)
+
+    results = {}
+    for name in args.stages.split(','):
+        func, items = stages[name]
+        results[name] = measure(func, items, args.repeats)
+        r = results[name]
+        print(f"{name:<11} p50 {r['p50_ms']:8.3f} ms  p95 {r['p95_ms']:8.3f} ms  p99 {r['p99_ms']:8.3f} ms  "
+              f"{r['throughput_per_s']:9.1f}/s  peak {r['peak_python_mb']:.1f} MB")
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'model': type(model).__name__,
+        'frames': len(frames),
+        'repeats': args.repeats,
+        'max_rss_mb': max_rss_mb(),
+        'stages': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        print(f"Comparing against {args.baseline}:")
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            raise SystemExit(f"Regression in: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+import argparse
+import collections
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from pipeline import DropOldestQueue, FpsMeter
+
+# Default device: 1 is the external webcam, 0 the built-in one
+CAMERA_SOURCE = os.environ.get('CAMERA_SOURCE', '1')
+
+# Where frames come from and how: `source` is a device index, a video file path or 'synthetic'.
+# width/height/fps of None keep the device defaults; buffer_size=1 keeps the driver from queueing stale frames.
+CaptureSource = collections.namedtuple(
+    "CaptureSource", ["name", "source", "width", "height", "fps", "buffer_size", "flip"],
+    defaults=(None, None, None, 1, True))
+
+
+def parse_source(spec, name=None, **options):
+    """'0' / '1' -> device index, 'synthetic' -> test pattern, anything else -> video file."""
+    source = int(spec) if str(spec).isdigit() else spec
+    return CaptureSource(name or str(spec), source, **options)
+
+
+# --- Synthetic Test Source ---
+class SyntheticCapture:
+    """A cv2.VideoCapture look-alike producing a moving test pattern at a fixed frame rate."""
+
+    def __init__(self, width=None, height=None, fps=None, seed=0):
+        self.width = width or 640
+        self.height = height or 480
+        self.fps = fps or 30.0
+        self._rng = np.random.default_rng(seed)
+        self._index = 0
+        self._next = time.perf_counter()
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        # Paced like a real camera, so consumers see realistic frame timing
+        delay = self._next - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self._next = max(self._next, time.perf_counter()) + 1.0 / self.fps
+        frame = self._rng.integers(0, 64, (self.height, self.width, 3), dtype=np.uint8)
+        angle = self._index / self.fps
+        center = (int(self.width * (0.5 + 0.3 * np.cos(angle))), int(self.height * (0.5 + 0.3 * np.sin(angle))))
+        cv2.circle(frame, center, min(self.width, self.height) // 6, (60, 120, 200), -1)
+        self._index += 1
+        return True, frame
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FPS: self.fps, cv2.CAP_PROP_FRAME_WIDTH: self.width, cv2.CAP_PROP_FRAME_HEIGHT: self.height}.get(prop, 0.0)
+
+    def release(self):
+        pass
+
+
+def open_capture(config):
+    """Opens a CaptureSource and applies its resolution, frame rate and buffer size."""
+    if config.source == 'synthetic':
+        return SyntheticCapture(config.width, config.height, config.fps)
+    cap = cv2.VideoCapture(config.source)
+    if isinstance(config.source, int):
+        # Drivers ignore what they do not support, so these are requests, not guarantees
+        if config.width:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, config.width)
+        if config.height:
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config.height)
+        if config.fps:
+            cap.set(cv2.CAP_PROP_FPS, config.fps)
+        if config.buffer_size:
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, config.buffer_size)
+    return cap
+
+
+# --- One Thread Per Source ---
+class CaptureStream(threading.Thread):
+    """
+    Reads one source on its own thread into its latest-frame slot, or into the given `outputs`
+    instead. Frames are flipped if configured and converted to RGB once, here. Video files are
+    played back at their own frame rate, like a camera, instead of as fast as they decode.
+    """
+
+    def __init__(self, config, outputs=()):
+        super().__init__(name=f"Capture-{config.name}", daemon=True)
+        self.config = config
+        self.latest = DropOldestQueue(maxsize=1)
+        self.outputs = list(outputs) or [self.latest]
+        self.meter = FpsMeter()
+        self.is_running = False
+        self.on_frame = None
+        self.cap = None
+
+    @property
+    def dropped(self):
+        # Frames replaced before the slowest consumer took them
+        return max(output.dropped for output in self.outputs)
+
+    def run(self):
+        self.is_running = True
+        self.cap = open_capture(self.config)
+        if not self.cap.isOpened():
+            print(f"Error: could not open capture source '{self.config.source}'.")
+            self.is_running = False
+            return
+        is_file = isinstance(self.config.source, str) and self.config.source != 'synthetic'
+        interval = 1.0 / (self.cap.get(cv2.CAP_PROP_FPS) or 30.0) if is_file else 0.0
+        next_frame = time.perf_counter()
+
+        while self.is_running:
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            if self.config.flip:
+                frame = cv2.flip(frame, 1)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
+            self.meter.tick()
+            for output in self.outputs:
+                output.put(frame)
+            if self.on_frame is not None:
+                self.on_frame()
+            if interval:
+                next_frame += interval
+                time.sleep(max(0.0, next_frame - time.perf_counter()))
+
+        self.cap.release()
+        self.is_running = False
+        print(f"Capture stream '{self.config.name}' finished.")
+
+    def stop(self):
+        self.is_running = False
+
+
+# --- N Streams Feeding A Shared Inference Pool ---
+class CaptureManager:
+    """
+    Runs one CaptureStream per source and a shared pool of `workers` inference threads.
+
+    `processor_factory(name)` is called once per stream and returns the callable that handles
+    that stream's frames (e.g. with its own MediaPipe tracker). A stream is handled by at most one
+    worker at a time, so its frames stay in order; workers take the newest frame of whichever
+    ready stream has waited longest, and older frames are dropped. Results go to
+    `on_result(name, result)`.
+    """
+
+    def __init__(self, configs, processor_factory, on_result=None, workers=2):
+        self.streams = {config.name: CaptureStream(config) for config in configs}
+        self.processors = {name: processor_factory(name) for name in self.streams}
+        self.on_result = on_result
+        self.processed = collections.Counter()
+        self._busy = set()
+        self._order = collections.deque(self.streams)
+        self._cond = threading.Condition()
+        self._workers = [threading.Thread(target=self._work, name=f"Inference-{i}", daemon=True) for i in range(workers)]
+        self.is_running = False
+        for stream in self.streams.values():
+            stream.on_frame = self._notify
+
+    def start(self):
+        self.is_running = True
+        for stream in self.streams.values():
+            stream.start()
+        for worker in self._workers:
+            worker.start()
+
+    def stop(self):
+        self.is_running = False
+        for stream in self.streams.values():
+            stream.stop()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in [*self.streams.values(), *self._workers]:
+            thread.join()
+
+    def alive(self):
+        return any(stream.is_alive() for stream in self.streams.values())
+
+    def _notify(self):
+        with self._cond:
+            self._cond.notify()
+
+    def _next_frame(self):
+        with self._cond:
+            while self.is_running:
+                for _ in range(len(self._order)):
+                    name = self._order[0]
+                    self._order.rotate(-1)
+                    if name not in self._busy:
+                        frame = self.streams[name].latest.get_latest()
+                        if frame is not None:
+                            self._busy.add(name)
+                            return name, frame
+                self._cond.wait(0.1)
+            return None, None
+
+    def _work(self):
+        while True:
+            name, frame = self._next_frame()
+            if name is None:
+                return
+            try:
+                result = self.processors[name](frame)
+                if self.on_result is not None:
+                    self.on_result(name, result)
+            except Exception as e:
+                print(f"Error processing stream '{name}': {e}")
+            finally:
+                with self._cond:
+                    self.processed[name] += 1
+                    self._busy.discard(name)
+                    self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {name: {
+                'capture_fps': round(stream.meter.fps, 1),
+                'frames': stream.meter.count,
+                'processed': self.processed[name],
+                'dropped': stream.dropped,
+                'alive': stream.is_alive(),
+            } for name, stream in self.streams.items()}
+
+
+# --- Headless Multi-Kiosk Runner ---
+def main():
+    import mediapipe as mp
+    from features import FeatureExtractor
+    from forest import load_model
+    from prediction_cache import PredictionCache
+    from sentence import StreamingDecoder
+
+    parser = argparse.ArgumentParser(description="Recognize signs from several cameras/videos at once.")
+    parser.add_argument('sources', nargs='*', default=[CAMERA_SOURCE], help="device indexes, video files or 'synthetic'")
+    parser.add_argument('--width', type=int)
+    parser.add_argument('--height', type=int)
+    parser.add_argument('--fps', type=float)
+    parser.add_argument('--buffer-size', type=int, default=1, help="driver frame buffer (devices only)")
+    parser.add_argument('--no-flip', action='store_true')
+    parser.add_argument('-w', '--workers', type=int, default=2, help="shared inference threads")
+    parser.add_argument('--stats-interval', type=float, default=5.0)
+    args = parser.parse_args()
+
+    model = load_model()
+    cache = PredictionCache()
+    configs = [parse_source(spec, name=f"{i}:{spec}", width=args.width, height=args.height, fps=args.fps,
+                            buffer_size=args.buffer_size, flip=not args.no_flip) for i, spec in enumerate(args.sources)]
+
+    def processor_factory(name):
+        # Per-stream tracker, extractor and decoder; the model and cache are shared
+        hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=1, min_detection_confidence=0.5)
+        extractor = FeatureExtractor(model.feature_schema, max_hands=1)
+        decoder = StreamingDecoder(model.classes_)
+
+        def process(rgb_frame):
+            results = hands.process(rgb_frame)
+            if not results.multi_hand_landmarks:
+                decoder.reset()
+                return None
+            return decoder.update(cache.predict_proba(model, extractor.extract(results.multi_hand_landmarks))[0])
+        return process
+
+    def on_result(name, letter):
+        if letter:
+            print(f"[{name}] {letter.upper()}")
+
+    manager = CaptureManager(configs, processor_factory, on_result, workers=args.workers)
+    manager.start()
+    try:
+        while manager.alive():
+            time.sleep(args.stats_interval)
+            for name, stats in manager.stats().items():
+                print(f"  {name}: {stats['capture_fps']} fps, {stats['processed']}/{stats['frames']} processed, {stats['dropped']} dropped")
+    except KeyboardInterrupt:
+        pass
+    manager.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 import cv2
 import mediapipe as mp
-import csv
 import os
+import sys
 import numpy as np
+from capture import CAMERA_SOURCE, open_capture, parse_source
+from features import DEFAULT_FEATURE_SCHEMA, FeatureExtractor
+from landmark_store import LandmarkStore
 
 # Create a directory to store the dataset if it doesn't exist
 DATA_DIR = './data'
@@ -13,16 +16,22 @@ if not os.path.exists(DATA_DIR):
 mp_hands = mp.solutions.hands
 hands = mp_hands.Hands(static_image_mode=False, max_num_hands=2, min_detection_confidence=0.5)
 
-cap = cv2.VideoCapture(1) # IMPORTANT: Use 1 for external webcam, 0 for built-in
+# Camera index (1 = external webcam, 0 = built-in) or a video file: python create_dataset.py 0
+cap = open_capture(parse_source(sys.argv[1] if len(sys.argv) > 1 else CAMERA_SOURCE))
+
+# Feature layout written to the dataset (see features.py); it is recorded in the store's manifest
+FEATURE_SCHEMA = DEFAULT_FEATURE_SCHEMA
+extractor = FeatureExtractor(FEATURE_SCHEMA, max_hands=1)
 
 # Number of samples to collect for each sign
 NUM_SAMPLES = 500
 current_sample = 0
 current_letter = ''
 
-# Open a CSV file to write the data
-csv_file = open(os.path.join(DATA_DIR, 'hand_landmarks.csv'), 'w', newline='')
-writer = csv.writer(csv_file)
+# Append this run to the chunked landmark store as a new session; earlier runs are kept
+STORE_DIR = os.path.join(DATA_DIR, 'landmarks')
+store = LandmarkStore(STORE_DIR, FEATURE_SCHEMA)
+writer = store.writer(chunk_rows=NUM_SAMPLES)
 
 print("Starting data collection script. Press a key (a-z) to start collecting data for that letter.")
 print("Make the sign in front of the camera. The script will collect 100 samples.")
@@ -37,18 +46,12 @@ while True:
     results = hands.process(rgb_frame)
 
     if results.multi_hand_landmarks:
-        hand_landmarks = results.multi_hand_landmarks[0]
-        
-        # Normalize and flatten landmarks
-        landmarks = []
-        base_x, base_y = hand_landmarks.landmark[0].x, hand_landmarks.landmark[0].y
-        for lm in hand_landmarks.landmark:
-            landmarks.append(lm.x - base_x)
-            landmarks.append(lm.y - base_y)
+        # Normalize and flatten landmarks of the first hand
+        landmarks = extractor.extract(results.multi_hand_landmarks)[0]
         
         # Collect data when a letter is selected
         if current_letter and current_sample < NUM_SAMPLES:
-            writer.writerow([current_letter] + landmarks)
+            writer.append(current_letter, landmarks)
             current_sample += 1
 
     # Display information on the frame
@@ -72,6 +75,7 @@ while True:
         current_sample = 0
         print(f"--- Switched to collecting data for letter: {current_letter.upper()} ---")
 
-csv_file.close()
+writer.close()
+print(f"Dataset now holds {len(store)} samples in {STORE_DIR}")
 cap.release()
 cv2.destroyAllWindows()
\ No newline at end of file
@@ -0,0 +1,140 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+from forest import CompiledForest, load_model
+from landmark_store import MANIFEST_NAME, LandmarkStore
+from sentence import SentenceBuilder, StreamingDecoder
+
+
+# --- Replayed Letter Sequences ---
+def make_sequence(rng, y, letters, hold_frames, transition_frames, gap_chance, noise):
+    """
+    Builds one fingerspelled sequence out of dataset rows: each letter is a run of consecutive
+    recorded frames of that sign, with a `noise` share swapped for rows of other signs
+    (misclassified frames). Letters are joined by either a gap with no hand or a transition
+    through random other signs. Returns row indices (None = no hand) and the letter segments.
+    """
+    by_label = {label: np.flatnonzero(y == label) for label in np.unique(y)}
+    indices, segments, previous = [], [], None
+    for _ in range(letters):
+        label = rng.choice([label for label in by_label if label != previous])
+        previous = label
+        rows = by_label[label]
+        start = int(rng.integers(0, max(len(rows) - hold_frames, 0) + 1))
+        held = rows[start:start + hold_frames]
+        if len(held) < hold_frames:
+            held = rng.choice(rows, hold_frames)
+        held = held.copy()
+        noisy = rng.random(hold_frames) < noise
+        held[noisy] = rng.integers(0, len(y), int(noisy.sum()))
+        segments.append((label, len(indices)))
+        indices.extend(held)
+        if rng.random() < gap_chance:
+            indices.extend([None] * transition_frames)
+        else:
+            indices.extend(rng.integers(0, len(y), transition_frames))
+    return indices, segments
+
+
+# --- Decoders Under Test ---
+def replay_hold(classes, probabilities, fps, hold_duration):
+    sentence = SentenceBuilder(hold_duration)
+    commits = []
+    for frame, proba in enumerate(probabilities):
+        if proba is None:
+            sentence.reset_hold()
+            continue
+        letter = sentence.update(classes[int(np.argmax(proba))], frame / fps)
+        if letter:
+            commits.append((frame, letter))
+    return commits
+
+
+def replay_smooth(classes, probabilities, fps, hold_duration):
+    decoder = StreamingDecoder(classes)
+    commits = []
+    for frame, proba in enumerate(probabilities):
+        if proba is None:
+            decoder.reset()
+            continue
+        letter = decoder.update(proba)
+        if letter:
+            commits.append((frame, letter))
+    return commits
+
+
+DECODERS = {'hold': replay_hold, 'smooth': replay_smooth}
+
+
+def score(commits, segments, total_frames):
+    """Latency (frames) of each letter's first correct commit; every other commit is a wrong insert."""
+    bounds = [start for _, start in segments] + [total_frames]
+    latencies, wrong = [], 0
+    for (label, start), end in zip(segments, bounds[1:]):
+        inside = [(frame, letter) for frame, letter in commits if start <= frame < end]
+        correct = [frame for frame, letter in inside if letter == label]
+        if correct:
+            latencies.append(correct[0] - start)
+        wrong += len(inside) - (1 if correct else 0)
+    return latencies, wrong
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay fingerspelled sequences through the letter commit decoders.")
+    parser.add_argument('--store', default='./data/landmarks', help="landmark store to draw sign frames from")
+    parser.add_argument('--model', help="compiled model (.npz) to use (default: model.npz, else model.pkl)")
+    parser.add_argument('--sequences', type=int, default=50)
+    parser.add_argument('--letters', type=int, default=8, help="letters per sequence")
+    parser.add_argument('--hold-frames', type=int, default=45, help="frames each sign is held")
+    parser.add_argument('--transition-frames', type=int, default=8, help="frames between signs")
+    parser.add_argument('--gap-chance', type=float, default=0.3, help="share of transitions where the hand leaves the frame")
+    parser.add_argument('--noise', type=float, default=0.1, help="share of held frames replaced by other signs")
+    parser.add_argument('--fps', type=float, default=30.0)
+    parser.add_argument('--hold', type=float, default=1.0, help="hold duration of the wall-clock decoder (s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help="JSON file for the results")
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(args.store, MANIFEST_NAME)):
+        raise SystemExit(f"Error: no landmark store at {args.store}. Run create_dataset.py first.")
+    X, y, _ = LandmarkStore.open(args.store).read()
+    model = CompiledForest.load(args.model) if args.model else load_model()
+    row_probabilities = model.predict_proba(X)
+
+    rng = np.random.default_rng(args.seed)
+    results = {name: {'letters': 0, 'committed': 0, 'wrong_inserts': 0, 'latencies': []} for name in DECODERS}
+    for _ in range(args.sequences):
+        indices, segments = make_sequence(rng, y, args.letters, args.hold_frames, args.transition_frames, args.gap_chance, args.noise)
+        probabilities = [None if index is None else row_probabilities[index] for index in indices]
+        for name, replay in DECODERS.items():
+            latencies, wrong = score(replay(model.classes_, probabilities, args.fps, args.hold), segments, len(indices))
+            results[name]['letters'] += len(segments)
+            results[name]['committed'] += len(latencies)
+            results[name]['wrong_inserts'] += wrong
+            results[name]['latencies'].extend(latencies)
+
+    report = {}
+    for name, result in results.items():
+        latencies_ms = np.array(result.pop('latencies'), dtype=np.float64) * 1000.0 / args.fps
+        result['missed'] = result['letters'] - result['committed']
+        result['latency_ms'] = {
+            'mean': float(latencies_ms.mean()) if latencies_ms.size else None,
+            'p50': float(np.percentile(latencies_ms, 50)) if latencies_ms.size else None,
+            'p95': float(np.percentile(latencies_ms, 95)) if latencies_ms.size else None,
+        }
+        report[name] = result
+        latency = result['latency_ms']
+        print(f"{name:<7} committed {result['committed']}/{result['letters']}  wrong inserts {result['wrong_inserts']:4d}  "
+              f"latency p50 {latency['p50'] or 0:7.1f} ms  p95 {latency['p95'] or 0:7.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'settings': vars(args), 'decoders': report}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import numpy as np
+
+NUM_LANDMARKS = 21
+# Index of the middle-finger MCP joint; its distance from the wrist is the hand scale
+SCALE_LANDMARK = 9
+
+# --- Feature Schemas ---
+# Every model records the schema it was trained on, so the feature layout cannot silently
+# drift between create_dataset.py, train_model.py and the two apps.
+#   id: (coordinates per landmark, scale-normalized)
+FEATURE_SCHEMAS = {
+    'xy-wrist-v1': (2, False),         # (x, y) relative to the wrist, the original 42-float layout
+    'xy-wrist-scaled-v1': (2, True),   # as above, divided by the wrist -> middle MCP distance
+    'xyz-wrist-scaled-v1': (3, True),  # scaled (x, y, z), 63 floats
+}
+DEFAULT_FEATURE_SCHEMA = 'xy-wrist-v1'
+
+
+def feature_size(schema=DEFAULT_FEATURE_SCHEMA):
+    dims, _ = FEATURE_SCHEMAS[schema]
+    return NUM_LANDMARKS * dims
+
+
+def landmarks_to_points(hand_landmarks, out=None):
+    """Copies one MediaPipe hand into a (21, 3) float32 array of normalized (x, y, z)."""
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+    out.reshape(-1)[:] = np.fromiter(
+        (value for lm in hand_landmarks.landmark for value in (lm.x, lm.y, lm.z)),
+        dtype=np.float32,
+        count=NUM_LANDMARKS * 3,
+    )
+    return out
+
+
+def points_to_features(points, schema=DEFAULT_FEATURE_SCHEMA, out=None):
+    """
+    Converts landmark points of shape (..., 21, k) into feature rows of shape (..., feature_size).
+    Works on a single hand or a batch of hands, writing into `out` when given.
+    """
+    dims, scaled = FEATURE_SCHEMAS[schema]
+    points = np.asarray(points, dtype=np.float32)
+    if points.shape[-2:-1] != (NUM_LANDMARKS,) or points.shape[-1] < dims:
+        raise ValueError(f"schema '{schema}' needs {NUM_LANDMARKS} points with {dims} coordinates, got shape {points.shape}")
+    batch_shape = points.shape[:-2]
+    if out is None:
+        out = np.empty(batch_shape + (NUM_LANDMARKS * dims,), dtype=np.float32)
+    relative = out.reshape(batch_shape + (NUM_LANDMARKS, dims))
+    np.subtract(points[..., :dims], points[..., :1, :dims], out=relative)
+    if scaled:
+        scale = np.hypot(relative[..., SCALE_LANDMARK, 0], relative[..., SCALE_LANDMARK, 1])
+        relative /= np.asarray(np.maximum(scale, 1e-6))[..., None, None]
+    return out
+
+
+def landmarks_to_features(hand_landmarks, schema=DEFAULT_FEATURE_SCHEMA):
+    """Feature row for one MediaPipe hand, freshly allocated (safe to hand to other threads)."""
+    return points_to_features(landmarks_to_points(hand_landmarks), schema)
+
+
+# --- Reusable Extractor For Per-Frame Loops ---
+class FeatureExtractor:
+    """
+    Converts `results.multi_hand_landmarks` into a (n_hands, feature_size) batch using buffers
+    allocated once up front. The returned array is a view that the next call overwrites, so
+    use one extractor per thread and copy rows that must outlive the frame.
+    """
+
+    def __init__(self, schema=DEFAULT_FEATURE_SCHEMA, max_hands=2):
+        self.schema = schema
+        self.max_hands = max_hands
+        self._points = np.empty((max_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+        self._features = np.empty((max_hands, feature_size(schema)), dtype=np.float32)
+
+    def extract(self, multi_hand_landmarks):
+        hands = list(multi_hand_landmarks or [])[:self.max_hands]
+        for i, hand_landmarks in enumerate(hands):
+            landmarks_to_points(hand_landmarks, out=self._points[i])
+        count = len(hands)
+        return points_to_features(self._points[:count], self.schema, out=self._features[:count])
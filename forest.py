@@ -0,0 +1,223 @@
+import pickle
+import sys
+
+import numpy as np
+
+from features import DEFAULT_FEATURE_SCHEMA
+
+# Leaf values gathered per evaluation chunk (rows x trees x classes), about 8 MB as float64
+CHUNK_VALUES = 1 << 20
+
+
+# --- Pickle-Free Random Forest Inference ---
+class CompiledForest:
+    """
+    A fitted sklearn RandomForestClassifier flattened into contiguous NumPy arrays.
+
+    All trees share one node table (feature, threshold, left, right, value); `roots` holds the
+    index of each tree's first node. Leaves point to themselves, so evaluation is a fixed number
+    of vectorized steps (the deepest tree's depth) over every (row, tree) pair of a chunk of rows
+    at once, with no per-call validation or joblib overhead. Predictions match sklearn's `predict_proba` / `predict`.
+    `feature_schema` names the features.py layout the forest was trained on and `trained_sessions`
+    the dataset sessions its trees have seen (used by incremental training). `tree_classes` marks
+    which classes each tree was trained on; it only differs from all-True after a merge.
+    """
+
+    def __init__(self, classes, feature, threshold, left, right, value, roots, max_depth, n_features,
+                 feature_schema=DEFAULT_FEATURE_SCHEMA, trained_sessions=(), tree_classes=None):
+        self.classes_ = classes
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features)
+        self.feature_schema = str(feature_schema)
+        self.trained_sessions = [str(session) for session in trained_sessions]
+        if tree_classes is None:
+            tree_classes = np.ones((roots.size, classes.size), dtype=bool)
+        self.tree_classes = tree_classes
+        # A class's probability is averaged over the trees that know it, so classes added
+        # by a merge are not outvoted by older trees that could never predict them
+        self._class_votes = tree_classes.sum(axis=0)
+        self._renormalize = bool((self._class_votes != roots.size).any())
+
+    @classmethod
+    def from_sklearn(cls, model):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        classes = np.asarray(model.classes_)
+        if classes.dtype == object:
+            # Labels read through pandas are Python strings; fixed-width unicode stores without pickle
+            classes = classes.astype(str)
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            # Leaves loop back to themselves so extra traversal steps are no-ops
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            # Same per-tree normalization sklearn applies in DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :len(model.classes_)].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+        return cls(
+            classes=classes,
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            n_features=model.n_features_in_,
+            feature_schema=getattr(model, 'feature_schema', DEFAULT_FEATURE_SCHEMA),
+            trained_sessions=getattr(model, 'trained_sessions', ()),
+        )
+
+    def merge(self, other):
+        """
+        Returns a forest holding the trees of both forests. Class lists are unioned and each
+        class's probability is averaged over the trees that were trained on it.
+        """
+        if other.feature_schema != self.feature_schema or other.n_features_in_ != self.n_features_in_:
+            raise ValueError("cannot merge forests trained on different feature schemas")
+        classes = np.union1d(self.classes_, other.classes_)
+        values, tree_classes = [], []
+        for forest in (self, other):
+            columns = np.searchsorted(classes, forest.classes_)
+            value = np.zeros((forest.value.shape[0], classes.size))
+            value[:, columns] = forest.value
+            values.append(value)
+            known = np.zeros((forest.roots.size, classes.size), dtype=bool)
+            known[:, columns] = forest.tree_classes
+            tree_classes.append(known)
+        offset = self.feature.size
+        return CompiledForest(
+            classes=classes,
+            feature=np.concatenate([self.feature, other.feature]),
+            threshold=np.concatenate([self.threshold, other.threshold]),
+            left=np.concatenate([self.left, other.left + offset]),
+            right=np.concatenate([self.right, other.right + offset]),
+            value=np.concatenate(values),
+            roots=np.concatenate([self.roots, other.roots + offset]),
+            max_depth=max(self.max_depth, other.max_depth),
+            n_features=self.n_features_in_,
+            feature_schema=self.feature_schema,
+            trained_sessions=list(dict.fromkeys(self.trained_sessions + other.trained_sessions)),
+            tree_classes=np.concatenate(tree_classes),
+        )
+
+    # --- Persistence (plain .npz, loaded with allow_pickle=False) ---
+    def save(self, path):
+        np.savez(
+            path,
+            classes=self.classes_,
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            roots=self.roots,
+            max_depth=np.array(self.max_depth),
+            n_features=np.array(self.n_features_in_),
+            feature_schema=np.array(self.feature_schema),
+            trained_sessions=np.array(self.trained_sessions, dtype=str),
+            tree_classes=self.tree_classes,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                classes=data['classes'],
+                feature=data['feature'].astype(np.intp),
+                threshold=data['threshold'],
+                left=data['left'].astype(np.intp),
+                right=data['right'].astype(np.intp),
+                value=data['value'],
+                roots=data['roots'].astype(np.intp),
+                max_depth=data['max_depth'],
+                n_features=data['n_features'],
+                # Models compiled before schemas were recorded use the original layout
+                feature_schema=data['feature_schema'] if 'feature_schema' in data.files else DEFAULT_FEATURE_SCHEMA,
+                trained_sessions=data['trained_sessions'] if 'trained_sessions' in data.files else (),
+                tree_classes=data['tree_classes'] if 'tree_classes' in data.files else None,
+            )
+
+    # --- Inference ---
+    def apply(self, X):
+        """Returns the leaf index reached in every tree, shape (n_samples, n_trees)."""
+        X = self._as_rows(X)
+        leaves = np.empty((X.shape[0], self.roots.size), dtype=np.intp)
+        for start in range(0, X.shape[0], self._chunk_rows):
+            leaves[start:start + self._chunk_rows] = self._apply(X[start:start + self._chunk_rows])
+        return leaves
+
+    def predict_proba(self, X):
+        X = self._as_rows(X)
+        proba = np.empty((X.shape[0], self.classes_.size))
+        # Rows are evaluated in chunks, so the (rows, trees, classes) leaf values stay small
+        # however many rows are passed (e.g. a whole landmark store)
+        for start in range(0, X.shape[0], self._chunk_rows):
+            chunk = X[start:start + self._chunk_rows]
+            proba[start:start + chunk.shape[0]] = self.value[self._apply(chunk)].sum(axis=1)
+        proba /= self._class_votes
+        if self._renormalize:
+            proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    @property
+    def _chunk_rows(self):
+        return max(1, CHUNK_VALUES // (self.roots.size * self.classes_.size))
+
+    @staticmethod
+    def _as_rows(X):
+        # sklearn evaluates splits on float32 inputs, so cast the same way to get identical leaves
+        X = np.asarray(X, dtype=np.float32)
+        return X.reshape(1, -1) if X.ndim == 1 else X
+
+    def _apply(self, X):
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.roots.size))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+# --- Model Loading Shared By The Desktop And Web Apps ---
+def load_model(compiled_path='model.npz', pickle_path='model.pkl'):
+    """Loads the compiled forest if it exists, falling back to the sklearn pickle. Pass compiled_path=None to force the pickle."""
+    if compiled_path:
+        try:
+            return CompiledForest.load(compiled_path)
+        except FileNotFoundError:
+            pass
+    with open(pickle_path, 'rb') as f:
+        model = pickle.load(f)
+    if not hasattr(model, 'feature_schema'):
+        model.feature_schema = DEFAULT_FEATURE_SCHEMA
+    return model
+
+
+# Converts an existing pickle without retraining: python forest.py [model.pkl] [model.npz]
+if __name__ == "__main__":
+    pickle_path = sys.argv[1] if len(sys.argv) > 1 else 'model.pkl'
+    compiled_path = sys.argv[2] if len(sys.argv) > 2 else 'model.npz'
+    with open(pickle_path, 'rb') as f:
+        sklearn_model = pickle.load(f)
+    CompiledForest.from_sklearn(sklearn_model).save(compiled_path)
+    print(f"Compiled {len(sklearn_model.estimators_)} trees from {pickle_path} into {compiled_path}")
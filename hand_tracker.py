@@ -0,0 +1,59 @@
+import cv2
+import numpy as np
+
+
+# --- Adaptive Hand Tracking Scheduler ---
+class AdaptiveHandTracker:
+    """
+    Runs `Hands.process(rgb)` and returns `(hand_landmarks, handedness)`: the detected hands and
+    their 'Left' / 'Right' labels, in the same order. Frames in which nothing moved are skipped:
+
+    * Every frame is shrunk to a small grayscale `thumbnail_size` image and compared with the
+      thumbnail of the last frame MediaPipe processed.
+    * If the mean absolute pixel difference is below `motion_threshold` (0-255 scale), the last
+      results are reused, for at most `max_skip` frames in a row.
+    * Any other frame goes through MediaPipe as usual.
+
+    The decision is made on the image rather than on the landmarks, because MediaPipe's landmarks
+    jitter between identical frames by more than a slowly moving hand moves. Comparing with the
+    last processed frame, not the previous one, keeps slow drift from adding up unnoticed. With
+    `static_image_mode=False` MediaPipe already tracks the hand between frames, so this does not
+    crop or track on its own.
+    """
+
+    def __init__(self, hands, motion_threshold=1.5, max_skip=4, thumbnail_size=(64, 48)):
+        self.hands = hands
+        self.motion_threshold = motion_threshold
+        self.max_skip = max_skip
+        self.thumbnail_size = thumbnail_size
+        self.last_landmarks = []
+        self.last_handedness = []
+        self._last_thumbnail = None
+        self._skipped_in_row = 0
+        self.counts = {'frames': 0, 'skipped': 0}
+
+    def process(self, rgb_frame):
+        self.counts['frames'] += 1
+        thumbnail = cv2.resize(cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2GRAY), self.thumbnail_size, interpolation=cv2.INTER_AREA)
+        if self._last_thumbnail is not None and self._skipped_in_row < self.max_skip:
+            if cv2.absdiff(thumbnail, self._last_thumbnail).mean() < self.motion_threshold:
+                self._skipped_in_row += 1
+                self.counts['skipped'] += 1
+                return self.last_landmarks, self.last_handedness
+        self._skipped_in_row = 0
+        self._last_thumbnail = thumbnail
+        results = self.hands.process(rgb_frame)
+        self.last_landmarks = list(results.multi_hand_landmarks or [])
+        self.last_handedness = [hand.classification[0].label for hand in results.multi_handedness or []]
+        return self.last_landmarks, self.last_handedness
+
+    def warm_up(self, shape=(480, 640, 3)):
+        """Runs a blank frame through the graph, so the first camera frame skips its start-up cost."""
+        self.hands.process(np.zeros(shape, dtype=np.uint8))
+
+    def stats(self):
+        frames = max(self.counts['frames'], 1)
+        return {key: count / frames for key, count in self.counts.items() if key != 'frames'}
+
+    def close(self):
+        self.hands.close()
@@ -0,0 +1,172 @@
+import collections
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PoolExhausted(RuntimeError):
+    """Raised when every tracker in the pool is busy and no new session can be admitted."""
+
+
+class _Session:
+    def __init__(self, tracker):
+        self.tracker = tracker
+        self.lock = threading.Lock()
+        self.in_use = 0
+        self.last_used = time.monotonic()
+
+
+# --- Session-Keyed Tracker Pool ---
+class HandsPool:
+    """
+    Keeps one MediaPipe `Hands` tracker per client session so tracking state never leaks
+    between users. Calls for the same session are serialized (frames stay in order), while
+    different sessions run in parallel on the server's worker threads.
+
+    The pool holds at most `max_sessions` trackers. Sessions idle for longer than
+    `idle_timeout` seconds are closed, and when the pool is full the least recently used
+    idle session is evicted to make room.
+    """
+
+    def __init__(self, factory, max_sessions=32, idle_timeout=120.0):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+
+    @contextmanager
+    def acquire(self, session_id):
+        session = self._checkout(session_id)
+        try:
+            with session.lock:
+                # Built under the session lock, not the pool lock, so a slow MediaPipe
+                # start-up only delays this session.
+                if session.tracker is None:
+                    session.tracker = self.factory()
+                yield session.tracker
+        finally:
+            with self._lock:
+                session.in_use -= 1
+                session.last_used = time.monotonic()
+
+    def _checkout(self, session_id):
+        with self._lock:
+            self._evict_idle()
+            session = self._sessions.get(session_id)
+            if session is None:
+                if len(self._sessions) >= self.max_sessions and not self._evict_lru():
+                    raise PoolExhausted(f"all {self.max_sessions} hand trackers are busy")
+                session = _Session(None)
+                self._sessions[session_id] = session
+                self.created += 1
+            self._sessions.move_to_end(session_id)
+            session.in_use += 1
+            return session
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        for session_id, session in list(self._sessions.items()):
+            if session.in_use == 0 and session.last_used < cutoff:
+                self._close(session_id)
+
+    def _evict_lru(self):
+        for session_id, session in self._sessions.items():
+            if session.in_use == 0:
+                self._close(session_id)
+                return True
+        return False
+
+    def _close(self, session_id):
+        session = self._sessions.pop(session_id)
+        self.evicted += 1
+        if session.tracker is not None:
+            session.tracker.close()
+
+    def close(self):
+        with self._lock:
+            for session_id in list(self._sessions):
+                self._close(session_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'active': sum(1 for session in self._sessions.values() if session.in_use),
+                'max_sessions': self.max_sessions,
+                'idle_timeout_s': self.idle_timeout,
+                'created': self.created,
+                'evicted': self.evicted,
+            }
+
+
+# --- Session-Keyed State Without A Tracker ---
+class SessionMap:
+    """
+    One cheap object per client session (e.g. a letter decoder), kept apart from the tracker
+    pool so its cap and evictions never touch this state. An entry is dropped only after
+    `idle_timeout` seconds without use. `max_sessions` is just a memory bound, far above the
+    number of trackers; past it the least recently used idle entry goes. Calls for the same
+    session are serialized, so its frames are applied in order.
+    """
+
+    def __init__(self, factory, max_sessions=4096, idle_timeout=120.0):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        # Ordered by last use, so idle entries are always at the front
+        self._sessions = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.expired = 0
+
+    @contextmanager
+    def acquire(self, session_id):
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = _Session(None)
+                self.created += 1
+                if len(self._sessions) > self.max_sessions:
+                    self._drop_lru()
+            self._sessions.move_to_end(session_id)
+            session.in_use += 1
+        try:
+            with session.lock:
+                if session.tracker is None:
+                    session.tracker = self.factory()
+                yield session.tracker
+        finally:
+            with self._lock:
+                session.in_use -= 1
+                session.last_used = time.monotonic()
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.in_use or session.last_used >= cutoff:
+                return
+            del self._sessions[session_id]
+            self.expired += 1
+
+    def _drop_lru(self):
+        for session_id, session in self._sessions.items():
+            if session.in_use == 0:
+                del self._sessions[session_id]
+                self.expired += 1
+                return
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'active': sum(1 for session in self._sessions.values() if session.in_use),
+                'max_sessions': self.max_sessions,
+                'idle_timeout_s': self.idle_timeout,
+                'created': self.created,
+                'expired': self.expired,
+            }
@@ -0,0 +1,178 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from features import DEFAULT_FEATURE_SCHEMA, feature_size
+
+MANIFEST_NAME = 'manifest.json'
+STORE_VERSION = 1
+
+
+# --- Chunked Columnar Landmark Store ---
+class LandmarkStore:
+    """
+    Append-only dataset of landmark feature rows, stored as a directory of chunks:
+
+        manifest.json                  schema, label and session vocabularies, chunk list
+        chunk-000000.features.npy      float32 (rows, n_features)
+        chunk-000000.labels.npy        int16 codes into the manifest's label list
+        chunk-000000.sessions.npy      int32 codes into the manifest's session list
+
+    Chunks are never rewritten, so every recording run only adds files, and the manifest is
+    replaced atomically after the chunk files are on disk. Chunks are plain .npy files that can
+    be memory-mapped, so training reads float32 directly instead of parsing text.
+    """
+
+    def __init__(self, path, feature_schema=DEFAULT_FEATURE_SCHEMA):
+        self.path = path
+        manifest_path = os.path.join(path, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self.manifest = json.load(f)
+            if self.manifest['feature_schema'] != feature_schema:
+                raise ValueError(f"store '{path}' holds schema '{self.manifest['feature_schema']}', not '{feature_schema}'")
+        else:
+            self.manifest = {
+                'version': STORE_VERSION,
+                'feature_schema': feature_schema,
+                'n_features': feature_size(feature_schema),
+                'labels': [],
+                'sessions': [],
+                'chunks': [],
+            }
+
+    @classmethod
+    def open(cls, path):
+        """Opens an existing store with whatever schema it was written with."""
+        with open(os.path.join(path, MANIFEST_NAME)) as f:
+            return cls(path, json.load(f)['feature_schema'])
+
+    @property
+    def feature_schema(self):
+        return self.manifest['feature_schema']
+
+    @property
+    def n_features(self):
+        return self.manifest['n_features']
+
+    def __len__(self):
+        return sum(chunk['rows'] for chunk in self.manifest['chunks'])
+
+    # --- Writing ---
+    def writer(self, session=None, chunk_rows=4096):
+        return ChunkWriter(self, session or time.strftime('%Y%m%d-%H%M%S'), chunk_rows)
+
+    def _code(self, vocabulary, value):
+        values = self.manifest[vocabulary]
+        if value not in values:
+            values.append(value)
+        return values.index(value)
+
+    def _append_chunk(self, features, labels, session):
+        os.makedirs(self.path, exist_ok=True)
+        name = f"chunk-{len(self.manifest['chunks']):06d}"
+        uniques, inverse = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+        label_codes = np.array([self._code('labels', label) for label in uniques], dtype=np.int16)[inverse]
+        session_codes = np.full(len(labels), self._code('sessions', session), dtype=np.int32)
+        np.save(os.path.join(self.path, f"{name}.features.npy"), np.asarray(features, dtype=np.float32))
+        np.save(os.path.join(self.path, f"{name}.labels.npy"), label_codes)
+        np.save(os.path.join(self.path, f"{name}.sessions.npy"), session_codes)
+        self.manifest['chunks'].append({'name': name, 'rows': len(labels)})
+        self._write_manifest()
+
+    def _write_manifest(self):
+        manifest_path = os.path.join(self.path, MANIFEST_NAME)
+        with open(manifest_path + '.tmp', 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+    # --- Reading ---
+    def iter_chunks(self, mmap=True):
+        """Yields (features, label_codes, session_codes) per chunk; arrays are memory-mapped by default."""
+        mode = 'r' if mmap else None
+        for chunk in self.manifest['chunks']:
+            base = os.path.join(self.path, chunk['name'])
+            yield (np.load(f"{base}.features.npy", mmap_mode=mode),
+                   np.load(f"{base}.labels.npy", mmap_mode=mode),
+                   np.load(f"{base}.sessions.npy", mmap_mode=mode))
+
+    def read(self):
+        """Returns (X float32, y label strings, session names) for the whole store in one preallocated copy."""
+        rows = len(self)
+        X = np.empty((rows, self.n_features), dtype=np.float32)
+        label_codes = np.empty(rows, dtype=np.int16)
+        session_codes = np.empty(rows, dtype=np.int32)
+        start = 0
+        for features, labels, sessions in self.iter_chunks():
+            end = start + len(labels)
+            X[start:end] = features
+            label_codes[start:end] = labels
+            session_codes[start:end] = sessions
+            start = end
+        y = np.array(self.manifest['labels'], dtype=str)[label_codes] if rows else np.array([], dtype=str)
+        sessions = np.array(self.manifest['sessions'], dtype=str)[session_codes] if rows else np.array([], dtype=str)
+        return X, y, sessions
+
+
+class ChunkWriter:
+    """Buffers rows for one recording session and writes them to the store a chunk at a time."""
+
+    def __init__(self, store, session, chunk_rows):
+        self.store = store
+        self.session = session
+        self.chunk_rows = chunk_rows
+        self._features = np.empty((chunk_rows, store.n_features), dtype=np.float32)
+        self._labels = []
+
+    def append(self, label, features):
+        self._features[len(self._labels)] = features
+        self._labels.append(label)
+        if len(self._labels) == self.chunk_rows:
+            self.flush()
+
+    def extend(self, labels, features):
+        # Large blocks (e.g. CSV imports) go straight to disk without passing through the buffer
+        self.flush()
+        self.store._append_chunk(features, labels, self.session)
+
+    def flush(self):
+        if self._labels:
+            self.store._append_chunk(self._features[:len(self._labels)], self._labels, self.session)
+            self._labels = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# --- CSV Import ---
+def import_csv(csv_path, store, session=None, chunk_rows=65536):
+    """Streams a `label, f0, f1, ...` CSV (the old create_dataset.py format) into the store."""
+    import pandas as pd
+    dtypes = {0: str, **{i: np.float32 for i in range(1, store.n_features + 1)}}
+    imported = 0
+    if os.path.getsize(csv_path) == 0:
+        return imported
+    with store.writer(session or f"import:{os.path.basename(csv_path)}") as writer:
+        for frame in pd.read_csv(csv_path, header=None, dtype=dtypes, chunksize=chunk_rows):
+            if frame.shape[1] - 1 != store.n_features:
+                raise ValueError(f"{csv_path} has {frame.shape[1] - 1} features, store expects {store.n_features}")
+            writer.extend(frame[0].to_numpy(), frame.iloc[:, 1:].to_numpy(dtype=np.float32))
+            imported += len(frame)
+    return imported
+
+
+# Imports an existing CSV: python landmark_store.py data/hand_landmarks.csv data/landmarks
+if __name__ == "__main__":
+    import sys
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else './data/hand_landmarks.csv'
+    store_path = sys.argv[2] if len(sys.argv) > 2 else './data/landmarks'
+    count = import_csv(csv_path, LandmarkStore(store_path))
+    print(f"Imported {count} rows from {csv_path} into {store_path}")
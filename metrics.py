@@ -0,0 +1,195 @@
+import bisect
+import json
+import random
+import threading
+import time
+
+# Latency buckets (seconds) spanning a cached prediction (~50 us) to a slow MediaPipe frame
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _label_text(names, values):
+    if not names:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in values)
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, escaped))
+    return "{" + pairs + "}"
+
+
+# --- Metric Types (Prometheus text exposition format, no client library needed) ---
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(self._render_values(items))
+        return lines
+
+    def _render_values(self, items):
+        return [f"{self.name}{_label_text(self.labels, key)} {value}" for key, value in items]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def track(self, *labels):
+        """Context manager counting the block as in flight while it runs."""
+        return _InFlight(self, labels)
+
+
+class _InFlight:
+    __slots__ = ('gauge', 'labels')
+
+    def __init__(self, gauge, labels):
+        self.gauge = gauge
+        self.labels = labels
+
+    def __enter__(self):
+        self.gauge.inc(*self.labels)
+
+    def __exit__(self, *exc_info):
+        self.gauge.dec(*self.labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _render_values(self, items):
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                labels = _label_text((*self.labels, "le"), (*key, bound))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _label_text(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+# --- Registry ---
+class Registry:
+    """Holds the metrics of one process; `collectors` refresh gauges right before a scrape."""
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labels=()):
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=()):
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def render(self):
+        for collect in self.collectors:
+            collect()
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# --- Per-Request Stage Timing With Sampled Tracing ---
+class StageTimer:
+    """
+    Times request stages into one histogram labelled by stage. When `trace_path` is set, a
+    `sample_rate` share of requests also gets every stage duration written as one JSON line.
+    Stage timings of the current request are kept thread-locally, since every request (and
+    every WebSocket connection) is handled on its own server thread.
+    """
+
+    def __init__(self, histogram, trace_path=None, sample_rate=0.0):
+        self.histogram = histogram
+        self.trace_path = trace_path
+        self.sample_rate = sample_rate if trace_path else 0.0
+        self._local = threading.local()
+        self._trace_lock = threading.Lock()
+
+    def begin(self):
+        # Sampling is decided up front, so unsampled requests never build a trace
+        self._local.trace = {} if self.sample_rate and random.random() < self.sample_rate else None
+
+    def stage(self, name):
+        """Context manager timing one stage of the current request."""
+        return _Stage(self, name)
+
+    def _record(self, name, elapsed):
+        self.histogram.observe(elapsed, name)
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            trace[name] = round(elapsed * 1000.0, 3)
+
+    def end(self, **fields):
+        trace = getattr(self._local, 'trace', None)
+        self._local.trace = None
+        if trace is None:
+            return
+        record = {'t': round(time.time(), 3), **fields, 'stages_ms': trace}
+        with self._trace_lock, open(self.trace_path, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+
+
+# Plain classes instead of @contextmanager generators: these run several times per request
+class _Stage:
+    __slots__ = ('timer', 'name', 'started')
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.timer._record(self.name, time.perf_counter() - self.started)
@@ -0,0 +1,139 @@
+import collections
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+
+# --- Bounded Queue With Drop-Oldest Policy ---
+class DropOldestQueue:
+    """A bounded FIFO that never blocks the producer: when full, the oldest item is discarded."""
+
+    def __init__(self, maxsize=1):
+        self._items = collections.deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Pops the oldest item, waiting up to `timeout` seconds. Returns None if nothing arrived."""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            return self._items.popleft() if self._items else None
+
+    def get_latest(self):
+        """Returns the newest item without waiting and discards everything older than it."""
+        with self._cond:
+            if not self._items:
+                return None
+            item = self._items.pop()
+            self.dropped += len(self._items)
+            self._items.clear()
+            return item
+
+    def drain(self):
+        with self._cond:
+            items = list(self._items)
+            self._items.clear()
+            return items
+
+    def __len__(self):
+        return len(self._items)
+
+
+# --- Double-Buffered Frame Hand-Off ---
+class SwapBuffers:
+    """
+    Two preallocated frames shared by one producer and one consumer thread, so finished frames
+    are handed over without allocating. The producer draws into `back()` and calls `publish()`;
+    the consumer reads the newest published frame inside `read()`, which holds off the next swap
+    until it is done, so a frame is never overwritten while it is being read.
+    """
+
+    def __init__(self, shape, dtype=np.uint8):
+        self.buffers = [np.zeros(shape, dtype=dtype), np.zeros(shape, dtype=dtype)]
+        self._lock = threading.Lock()
+        self._back = 0
+        self._fresh = False
+
+    def back(self):
+        return self.buffers[self._back]
+
+    def publish(self):
+        with self._lock:
+            self._back ^= 1
+            self._fresh = True
+
+    @contextmanager
+    def read(self):
+        """Yields the index of the newest published buffer, or None if nothing new was published."""
+        with self._lock:
+            if not self._fresh:
+                yield None
+                return
+            self._fresh = False
+            yield self._back ^ 1
+
+
+# --- Throughput Measurement ---
+class FpsMeter:
+    """Exponentially smoothed frames-per-second estimate, updated with tick()."""
+
+    def __init__(self, smoothing=0.9):
+        self.smoothing = smoothing
+        self.fps = 0.0
+        self.count = 0
+        self._last = None
+
+    def tick(self):
+        now = time.perf_counter()
+        if self._last is not None:
+            interval = now - self._last
+            if interval > 0:
+                instant = 1.0 / interval
+                self.fps = instant if self.count <= 1 else self.smoothing * self.fps + (1 - self.smoothing) * instant
+        self._last = now
+        self.count += 1
+
+
+# --- Pipeline Stage Worker ---
+class PipelineStage(threading.Thread):
+    """
+    Pulls items from `inbox`, runs `func` on each one and pushes non-None results to every queue in `outputs`.
+    The stage runs at its own rate; slow stages lose stale input instead of backing up the stages before them.
+    """
+
+    def __init__(self, name, func, inbox, outputs=()):
+        super().__init__(name=name, daemon=True)
+        self.func = func
+        self.inbox = inbox
+        self.outputs = list(outputs)
+        self.meter = FpsMeter()
+        self.is_running = False
+
+    def run(self):
+        self.is_running = True
+        while self.is_running:
+            item = self.inbox.get(timeout=0.1)
+            if item is None:
+                continue
+            try:
+                result = self.func(item)
+            except Exception as e:
+                print(f"Error in pipeline stage '{self.name}': {e}")
+                continue
+            self.meter.tick()
+            if result is not None:
+                for output in self.outputs:
+                    output.put(result)
+
+    def stop(self):
+        self.is_running = False
@@ -0,0 +1,104 @@
+import collections
+import threading
+
+import numpy as np
+
+
+# --- Quantized Landmark Prediction Cache ---
+class PredictionCache:
+    """
+    Bounded LRU map from feature vectors to class-probability rows.
+
+    Entries are keyed on the vector rounded to a grid of `tolerance`. With 42 jittering
+    coordinates a held sign rarely lands in exactly the same cell twice, so a miss on the
+    key is followed by a nearest-neighbour check against the `recent` most recently used
+    entries: any whose coordinates are all within `tolerance` (L-infinity) is a hit.
+    Held signs then reuse the probabilities of an earlier frame instead of running the
+    forest again, and a slowly drifting hand misses again once it has moved `tolerance`.
+
+    The cache is thread-safe and holds no model reference: the desktop app and the web
+    server each keep one instance and call `predict_proba(model, X)` or `lookup`/`store`.
+    Call `clear()` whenever the model is replaced, since cached rows belong to one model.
+    """
+
+    def __init__(self, max_entries=4096, tolerance=0.005, recent=8):
+        self.max_entries = max_entries
+        self.tolerance = tolerance
+        self._entries = collections.OrderedDict()
+        self._recent = collections.deque(maxlen=recent)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, features):
+        cells = np.rint(np.asarray(features, dtype=np.float32).reshape(-1) / self.tolerance)
+        return cells.astype(np.int32).tobytes()
+
+    def lookup(self, features):
+        """Returns the cached probability row for one feature vector, or None."""
+        row = np.asarray(features, dtype=np.float32).reshape(-1)
+        key = self.key(row)
+        with self._lock:
+            if key not in self._entries:
+                key = self._nearest_recent(row)
+            if key is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][1]
+
+    def _nearest_recent(self, row):
+        candidates = [key for key in self._recent if key in self._entries]
+        if not candidates:
+            return None
+        rows = np.vstack([self._entries[key][0] for key in candidates])
+        distances = np.abs(rows - row).max(axis=1)
+        best = int(np.argmin(distances))
+        return candidates[best] if distances[best] <= self.tolerance else None
+
+    def store(self, features, proba):
+        row = np.array(features, dtype=np.float32).reshape(-1)
+        key = self.key(row)
+        with self._lock:
+            self._entries[key] = (row, proba)
+            self._entries.move_to_end(key)
+            if key not in self._recent:
+                self._recent.append(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def predict_proba(self, model, X):
+        """Batch lookup; all misses are classified together in one `model.predict_proba` call."""
+        X = np.atleast_2d(X)
+        rows = [self.lookup(row) for row in X]
+        missing = [i for i, proba in enumerate(rows) if proba is None]
+        if missing:
+            for i, proba in zip(missing, model.predict_proba(X[missing])):
+                self.store(X[i], proba)
+                rows[i] = proba
+        return np.vstack(rows)
+
+    def predict(self, model, X):
+        return model.classes_[np.argmax(self.predict_proba(model, X), axis=1)]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._recent.clear()
+
+    # --- Statistics ---
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'max_entries': self.max_entries,
+                'tolerance': self.tolerance,
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,159 @@
+import numpy as np
+
+
+# --- Hold-To-Commit Sentence Builder ---
+class SentenceBuilder:
+    """
+    Turns a stream of per-frame letter predictions into text. A letter is committed once the
+    same prediction has been held for `hold_duration` seconds, and never twice in a row.
+    Timestamps are passed in by the caller, so the same logic serves the live camera
+    (wall-clock time) and offline transcription (video timestamps).
+    """
+
+    def __init__(self, hold_duration=1.0):
+        self.hold_duration = hold_duration
+        self.text = ""
+        self.last_prediction = None
+        self.prediction_start_time = None
+
+    def update(self, prediction, now):
+        """Feeds one prediction seen at time `now`; returns the committed letter, if any."""
+        if not prediction: return None
+        if prediction == self.last_prediction:
+            if (now - self.prediction_start_time) >= self.hold_duration:
+                self.last_prediction = None
+                if not self.text or self.text[-1].lower() != prediction.lower():
+                    self.text += prediction
+                    return prediction
+        else:
+            self.last_prediction = prediction
+            self.prediction_start_time = now
+        return None
+
+    def append(self, letter):
+        # Commits decided elsewhere (StreamingDecoder) skip the hold rule
+        self.text += letter
+
+    def reset_hold(self):
+        # Called when no hand is visible, so a held letter has to start over
+        self.last_prediction = None
+
+    def add_space(self):
+        if not self.text or self.text[-1] != ' ':
+            self.text += " "
+            return True
+        return False
+
+    def last_word(self):
+        words = self.text.split()
+        return words[-1] if words else ""
+
+    def backspace(self):
+        if self.text:
+            self.text = self.text[:-1]
+            return True
+        return False
+
+    def clear(self):
+        self.text = ""
+
+
+# --- Confidence-Aware Streaming Decoder ---
+class StreamingDecoder:
+    """
+    Frame-counted replacement for the wall-clock hold, fed one `predict_proba` row per frame.
+
+    The last `window` rows are kept in a ring buffer and averaged (a soft vote). A letter is
+    committed once its averaged probability has stayed at or above `commit_threshold` for
+    `commit_frames` consecutive frames. It then stays latched, and is not committed again,
+    until its average falls below `release_threshold` or another letter reaches the commit
+    threshold. A single noisy frame therefore moves the average a little instead of
+    restarting the hold, and a burst of noise does not commit the held letter twice, while a
+    letter can still be repeated by lowering the hand (`reset`) or changing sign in between.
+
+    Use one decoder per tracked hand (see `HandDecoders`) or per web session.
+    """
+
+    def __init__(self, classes, window=8, commit_frames=4, commit_threshold=0.6, release_threshold=0.2):
+        self.classes = np.asarray(classes)
+        self.window = window
+        self.commit_frames = commit_frames
+        self.commit_threshold = commit_threshold
+        self.release_threshold = release_threshold
+        self._rows = np.zeros((window, len(self.classes)), dtype=np.float64)
+        self.reset()
+
+    def reset(self):
+        """Forget the current hand, e.g. because it left the frame."""
+        self._rows[:] = 0.0
+        self._sum = np.zeros(len(self.classes), dtype=np.float64)
+        self._count = 0
+        self._latched = None
+        self._candidate = None
+        self._streak = 0
+        self.label = None
+        self.confidence = 0.0
+
+    def update(self, proba):
+        """Feeds one frame's class probabilities; returns the committed letter, if any."""
+        slot = self._count % self.window
+        self._sum += proba - self._rows[slot]
+        self._rows[slot] = proba
+        self._count += 1
+        scores = self._sum / min(self._count, self.window)
+        best = int(np.argmax(scores))
+        self.label, self.confidence = self.classes[best], float(scores[best])
+
+        if self._latched is not None:
+            if best == self._latched or (scores[self._latched] >= self.release_threshold and self.confidence < self.commit_threshold):
+                return None
+            self._latched = None
+        if self.confidence < self.commit_threshold:
+            self._candidate, self._streak = None, 0
+            return None
+        if best != self._candidate:
+            self._candidate, self._streak = best, 0
+        self._streak += 1
+        if self._streak < self.commit_frames:
+            return None
+        self._latched, self._candidate, self._streak = best, None, 0
+        return self.classes[best]
+
+
+# --- Per-Hand Decoding For Several Tracked Hands ---
+class HandDecoders:
+    """
+    One `StreamingDecoder` per hand, keyed by MediaPipe's handedness label ('Left' / 'Right').
+    MediaPipe does not keep the order of `multi_hand_landmarks` stable (when the first hand
+    leaves, the second one moves up), so decoders keyed by position would mix two hands'
+    frames. Each hand's frames feed its own decoder, and a hand that leaves starts over.
+
+    Only the primary hand writes letters: the first hand to appear, until it leaves the frame.
+    Then a hand still in view takes over, with the frames it has already built up.
+    """
+
+    def __init__(self, classes, **decoder_options):
+        self.classes = classes
+        self.decoder_options = decoder_options
+        self.decoders = {}
+        self.primary = None
+
+    def reset(self):
+        self.decoders.clear()
+        self.primary = None
+
+    def update(self, handedness, probabilities):
+        """Feeds one frame; `handedness` and `probabilities` list the detected hands in the same order. Returns the primary hand's committed letter, if any."""
+        letters = {}
+        for hand, proba in zip(handedness, probabilities):
+            # Should MediaPipe label both hands alike, only the first of them is decoded
+            if hand not in letters:
+                if hand not in self.decoders:
+                    self.decoders[hand] = StreamingDecoder(self.classes, **self.decoder_options)
+                letters[hand] = self.decoders[hand].update(proba)
+        for hand in list(self.decoders):
+            if hand not in letters:
+                del self.decoders[hand]
+        if self.primary not in letters:
+            self.primary = next(iter(letters), None)
+        return letters.get(self.primary)
@@ -0,0 +1,138 @@
+import collections
+import os
+import queue
+import tempfile
+import threading
+import wave
+
+import numpy as np
+
+from warmup import LazyModule
+
+pyttsx3 = LazyModule('pyttsx3')
+
+# Sample width (bytes) of a rendered WAV -> NumPy sample type; 8-bit WAV is unsigned
+WAV_SAMPLE_TYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+# Only single words up to this length are cached; sentences rarely repeat exactly
+MAX_CACHED_LENGTH = 24
+
+
+# --- Persistent Text-To-Speech Worker ---
+class SpeechWorker(threading.Thread):
+    """
+    Speaks queued text on one long-lived pyttsx3 engine. The engine is created once, on this
+    thread, since engines belong to the thread that made them. `speak` only queues, so the caller
+    never waits on the engine, and phrases are spoken one after another instead of racing.
+    `busy` stays True while anything is queued or being spoken. Callers poll it and are never
+    called back from this thread.
+
+    With `cache_size` > 0 and sounddevice installed, single words are rendered to audio once and
+    the last `cache_size` of them are replayed from memory, so repeated words skip synthesis.
+    Longer text is spoken directly, so it starts without waiting for a full render. If the
+    rendering or playback fails (e.g. no readable WAV, no output device), the word is spoken
+    directly and the cache is turned off.
+    """
+
+    def __init__(self, rate=None, cache_size=0):
+        super().__init__(name="Speech", daemon=True)
+        self.rate = rate
+        self.cache_size = cache_size
+        self.cache = collections.OrderedDict()
+        self.counts = {'spoken': 0, 'cache_hits': 0}
+        self._queue = queue.Queue()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._engine = None
+        self._sounddevice = None
+
+    @property
+    def busy(self):
+        with self._lock:
+            return self._pending > 0
+
+    def speak(self, text):
+        """Queues `text`; returns False if there is nothing to say."""
+        text = text.strip()
+        if not text:
+            return False
+        with self._lock:
+            self._pending += 1
+        self._queue.put(text)
+        return True
+
+    def stop(self):
+        self._queue.put(None)
+
+    def run(self):
+        try:
+            self._engine = pyttsx3.init()
+            if self.rate:
+                self._engine.setProperty('rate', self.rate)
+        except Exception as e:
+            print(f"Error starting text-to-speech: {e}")
+        if self._engine is not None and self.cache_size:
+            try:
+                import sounddevice
+                self._sounddevice = sounddevice
+            except (ImportError, OSError):  # OSError: the PortAudio library is missing
+                print("sounddevice not available, speech will not be cached.")
+
+        while True:
+            text = self._queue.get()
+            if text is None:
+                return
+            try:
+                # Without an engine the queue is still drained, so `busy` clears
+                if self._engine is not None:
+                    self._say(text)
+            except Exception as e:
+                print(f"Error in text-to-speech: {e}")
+            finally:
+                with self._lock:
+                    self._pending -= 1
+
+    def _say(self, text):
+        self.counts['spoken'] += 1
+        if self._sounddevice is None or ' ' in text or len(text) > MAX_CACHED_LENGTH:
+            self._say_directly(text)
+            return
+        key = text.lower()
+        try:
+            audio = self.cache.get(key)
+            if audio is None:
+                audio = self._render(text)
+                self.cache[key] = audio
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            else:
+                self.cache.move_to_end(key)
+                self.counts['cache_hits'] += 1
+            samples, sample_rate = audio
+            self._sounddevice.play(samples, sample_rate)
+            self._sounddevice.wait()
+        except Exception as e:
+            # e.g. an engine that writes AIFF, a sample width WAV_SAMPLE_TYPES lacks, or no audio device
+            print(f"Could not play cached speech ({e}), speaking directly from now on.")
+            self._sounddevice = None
+            self.cache.clear()
+            self._say_directly(text)
+
+    def _say_directly(self, text):
+        self._engine.say(text)
+        self._engine.runAndWait()
+
+    def _render(self, text):
+        # pyttsx3 can only render to a file, so it goes through a temporary WAV
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            self._engine.save_to_file(text, path)
+            self._engine.runAndWait()
+            with wave.open(path, 'rb') as f:
+                sample_type = WAV_SAMPLE_TYPES[f.getsampwidth()]
+                channels = f.getnchannels()
+                sample_rate = f.getframerate()
+                frames = f.readframes(f.getnframes())
+        finally:
+            os.remove(path)
+        return np.frombuffer(frames, dtype=sample_type).reshape(-1, channels), sample_rate
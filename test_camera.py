@@ -1,24 +1,37 @@
+import sys
+import time
+
 import cv2
 
-# Use index 1 to test the external webcam
-cap = cv2.VideoCapture(1) 
+from capture import CAMERA_SOURCE, CaptureStream, parse_source
 
-if not cap.isOpened():
-    print("❌ Error: Cannot open camera at index 1.") # Updated message
-else:
-    print("✅ Success! Camera at index 1 is working.") # Updated message
-    print("Press 'q' to quit.")
+# Tests one or more sources at once: python test_camera.py 0 1 synthetic
+sources = sys.argv[1:] or [CAMERA_SOURCE]
+streams = [CaptureStream(parse_source(spec, flip=False)) for spec in sources]
+for stream in streams:
+    stream.start()
 
-    while True:
-        success, frame = cap.read()
-        if not success:
-            print("Failed to grab frame.")
-            break
-
-        cv2.imshow("Camera Test", frame)
+time.sleep(1.0)
+working = [stream for stream in streams if stream.is_alive()]
+for stream in streams:
+    if stream in working:
+        print(f"✅ Success! Camera '{stream.config.source}' is working.")
+    else:
+        print(f"❌ Error: Cannot open camera '{stream.config.source}'.")
 
+if working:
+    print("Press 'q' to quit.")
+    while any(stream.is_alive() for stream in working):
+        for stream in working:
+            frame = stream.latest.get_latest()
+            if frame is not None:
+                # Streams deliver RGB; imshow expects BGR
+                cv2.imshow(f"Camera Test {stream.config.name}", cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
-    cap.release()
-    cv2.destroyAllWindows()
\ No newline at end of file
+    for stream in working:
+        stream.stop()
+        stream.join()
+        print(f"{stream.config.name}: {stream.meter.fps:.1f} fps, {stream.meter.count} frames, {stream.dropped} dropped")
+    cv2.destroyAllWindows()
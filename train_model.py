@@ -1,34 +1,194 @@
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
+import argparse
+import json
+import os
+import time
+from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
 from sklearn.metrics import accuracy_score
+import numpy as np
 import pickle
+from forest import CompiledForest
+from features import DEFAULT_FEATURE_SCHEMA
+from landmark_store import MANIFEST_NAME, LandmarkStore, import_csv
 
-# Load the dataset
-DATA_FILE = './data/hand_landmarks.csv'
-df = pd.read_csv(DATA_FILE, header=None)
+STORE_DIR = './data/landmarks'
+# Older datasets were plain CSV (schema 'xy-wrist-v1'); they are imported into the store once
+LEGACY_CSV = './data/hand_landmarks.csv'
+MODEL_PATH = './model.pkl'
+COMPILED_MODEL_PATH = './model.npz'
+REPORT_PATH = './model_report.json'
 
-# Separate features (X) and labels (y)
-X = df.iloc[:, 1:] # All columns except the first one (landmarks)
-y = df.iloc[:, 0]  # The first column (the letter)
 
-# Split the data into training and testing sets
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+# --- Data Loading ---
+def load_dataset():
+    """Reads the chunked store written by create_dataset.py (memory-mapped, float32)."""
+    if os.path.exists(os.path.join(STORE_DIR, MANIFEST_NAME)):
+        store = LandmarkStore.open(STORE_DIR)
+    else:
+        store = LandmarkStore(STORE_DIR, DEFAULT_FEATURE_SCHEMA)
+    if len(store) == 0 and os.path.exists(LEGACY_CSV):
+        print(f"Importing {LEGACY_CSV} into {STORE_DIR}...")
+        import_csv(LEGACY_CSV, store)
+    if len(store) == 0:
+        raise SystemExit(f"Error: no training data in {STORE_DIR}. Run create_dataset.py first.")
+    X, y, sessions = store.read()
+    print(f"Loaded {len(y)} samples from {len(set(sessions))} session(s).")
+    return store.feature_schema, X, y, sessions
 
-# Initialize and train the Random Forest Classifier
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-print("Training model...")
-model.fit(X_train, y_train)
-print("Model training complete.")
 
-# Evaluate the model
-y_pred = model.predict(X_test)
-accuracy = accuracy_score(y_test, y_pred)
-print(f"Model Accuracy: {accuracy * 100:.2f}%")
+# --- Latency Measurement ---
+def measure_latency(compiled, X, repeats=200):
+    """Single-row predict latency of the compiled forest, as the apps call it (ms)."""
+    rows = X[np.arange(repeats) % len(X)]
+    latencies = []
+    for row in rows:
+        started = time.perf_counter()
+        compiled.predict(row.reshape(1, -1))
+        latencies.append(time.perf_counter() - started)
+    latencies_ms = np.array(latencies) * 1000.0
+    return {'p50_ms': float(np.percentile(latencies_ms, 50)), 'p95_ms': float(np.percentile(latencies_ms, 95))}
+
+
+def compare_latency(compiled_models, X, rounds=5, repeats=200):
+    """
+    measure_latency for several models, interleaved over `rounds` so that load changes on the
+    machine hit every model alike instead of whichever happened to be timed at the time.
+    """
+    rows = X[np.arange(repeats) % len(X)]
+    latencies = [[] for _ in compiled_models]
+    for _ in range(rounds):
+        for compiled, samples in zip(compiled_models, latencies):
+            for row in rows:
+                started = time.perf_counter()
+                compiled.predict(row.reshape(1, -1))
+                samples.append(time.perf_counter() - started)
+    return [{'p50_ms': float(np.percentile(np.array(samples) * 1000.0, 50)),
+             'p95_ms': float(np.percentile(np.array(samples) * 1000.0, 95))} for samples in latencies]
+
+
+def evaluate(compiled, X_test, y_test):
+    return {'test_accuracy': float(accuracy_score(y_test, compiled.predict(X_test))), **measure_latency(compiled, X_test)}
+
+
+# --- Full Training With Parallel Hyperparameter Search ---
+def search(args, X_train, y_train, X_test, y_test):
+    candidates = [(RandomForestClassifier, 'random_forest')]
+    if args.extra_trees:
+        # Extremely randomized trees: cheaper to fit, often shallower and faster to evaluate
+        candidates.append((ExtraTreesClassifier, 'extra_trees'))
+    grid = {'n_estimators': args.trees, 'max_depth': [None if depth == 0 else depth for depth in args.depths]}
+
+    results = []
+    for estimator, name in candidates:
+        print(f"Cross-validating {name} over {grid} ({args.cv}-fold, n_jobs={args.jobs})...")
+        cv = GridSearchCV(estimator(random_state=args.seed), grid, cv=args.cv, n_jobs=args.jobs, refit=False)
+        cv.fit(X_train, y_train)
+        for params, score in zip(cv.cv_results_['params'], cv.cv_results_['mean_test_score']):
+            results.append({'model': name, 'params': params, 'cv_accuracy': float(score), 'estimator': estimator})
+
+    # Only candidates close to the best CV accuracy are worth fitting and timing
+    best_cv = max(result['cv_accuracy'] for result in results)
+    finalists = [result for result in results if result['cv_accuracy'] >= best_cv - args.accuracy_tolerance]
+    compiled_models = []
+    for result in finalists:
+        model = result['estimator'](random_state=args.seed, n_jobs=args.jobs, **result['params']).fit(X_train, y_train)
+        result['sklearn_model'] = model
+        compiled_models.append(CompiledForest.from_sklearn(model))
+        result['test_accuracy'] = float(accuracy_score(y_test, compiled_models[-1].predict(X_test)))
+    for result, latency in zip(finalists, compare_latency(compiled_models, X_test)):
+        result.update(latency)
+        print(f"  {result['model']} {result['params']}: cv {result['cv_accuracy']:.4f}, "
+              f"test {result['test_accuracy']:.4f}, p50 {result['p50_ms']:.3f} ms")
+
+    # Fastest model among those within tolerance of the best accuracy. Latencies within
+    # latency_margin of the fastest are timing noise, so among those the smallest forest wins.
+    fastest = min(result['p50_ms'] for result in finalists)
+    contenders = [result for result in finalists if result['p50_ms'] <= fastest * (1.0 + args.latency_margin)]
+    chosen = min(contenders, key=lambda result: (result['params']['n_estimators'], result['params']['max_depth'] or float('inf'), -result['cv_accuracy']))
+    return chosen, results
+
+
+# --- Incremental Training ---
+def grow(args, base, X_train, y_train, sessions):
+    """Adds freshly trained trees to an existing compiled forest; new classes are merged in."""
+    # Offset by the trees already in the forest, so each run grows different trees but reruns match
+    model = RandomForestClassifier(n_estimators=args.add_trees, random_state=args.seed + int(base.roots.size), n_jobs=args.jobs)
+    model.fit(X_train, y_train)
+    model.feature_schema = base.feature_schema
+    model.trained_sessions = sessions
+    return base.merge(CompiledForest.from_sklearn(model))
+
+
+def write_report(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Report saved to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train (or incrementally grow) the hand sign classifier.")
+    parser.add_argument('--incremental', action='store_true', help="add trees for sessions the current model.npz has not seen")
+    parser.add_argument('--add-trees', type=int, default=20, help="trees to add in incremental mode")
+    parser.add_argument('--trees', type=int, nargs='+', default=[25, 50, 100, 200], help="forest sizes to search")
+    parser.add_argument('--depths', type=int, nargs='+', default=[0, 10, 20], help="max depths to search (0 = unlimited)")
+    parser.add_argument('--extra-trees', action='store_true', help="also search ExtraTreesClassifier")
+    parser.add_argument('--cv', type=int, default=5, help="cross-validation folds")
+    parser.add_argument('--jobs', type=int, default=-1, help="parallel jobs (-1 = all cores)")
+    parser.add_argument('--accuracy-tolerance', type=float, default=0.005,
+                        help="CV accuracy a model may give up for lower latency")
+    parser.add_argument('--latency-margin', type=float, default=0.25,
+                        help="relative p50 difference treated as a tie, broken in favor of fewer trees")
+    parser.add_argument('--seed', type=int, default=42, help="random seed for the data split and the forests")
+    parser.add_argument('--report', default=REPORT_PATH, help="latency/accuracy report to write next to the model")
+    args = parser.parse_args()
+
+    feature_schema, X, y, sessions = load_dataset()
+    report = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'feature_schema': feature_schema, 'samples': len(y), 'seed': args.seed}
+    # Split the data into training and testing sets
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=args.seed, stratify=y)
+
+    if args.incremental:
+        base = CompiledForest.load(COMPILED_MODEL_PATH)
+        new_sessions = sorted(set(sessions) - set(base.trained_sessions))
+        if not new_sessions:
+            print("No new sessions since the last training run; nothing to do.")
+            return
+        new_classes = sorted(set(y) - set(base.classes_))
+        print(f"Growing model with {args.add_trees} trees for {len(new_sessions)} new session(s)"
+              + (f", new classes: {', '.join(new_classes)}" if new_classes else "") + "...")
+        # New trees learn from all data so they also vote sensibly on the old classes
+        compiled = grow(args, base, X_train, y_train, sorted(set(sessions)))
+        report.update({'mode': 'incremental', 'new_sessions': new_sessions, 'new_classes': new_classes,
+                       'trees': int(compiled.roots.size), 'before': evaluate(base, X_test, y_test),
+                       'after': evaluate(compiled, X_test, y_test)})
+        print(f"Model Accuracy: {report['before']['test_accuracy'] * 100:.2f}% -> {report['after']['test_accuracy'] * 100:.2f}%"
+              " (old trees may have seen part of the test split)")
+        # model.pkl cannot hold the merged forest; it stays as the last full training run
+    else:
+        chosen, results = search(args, X_train, y_train, X_test, y_test)
+        model = chosen['sklearn_model']
+        model.feature_schema = feature_schema
+        model.trained_sessions = sorted(set(sessions))
+        compiled = CompiledForest.from_sklearn(model)
+        if (compiled.predict(X_test) != model.predict(X_test)).any():
+            raise RuntimeError("Compiled forest predictions differ from the sklearn model")
+        print(f"Selected {chosen['model']} {chosen['params']}")
+        print(f"Model Accuracy: {chosen['test_accuracy'] * 100:.2f}%, latency p50 {chosen['p50_ms']:.3f} ms")
+        report.update({'mode': 'search', 'chosen': {key: chosen[key] for key in ('model', 'params', 'cv_accuracy', 'test_accuracy', 'p50_ms', 'p95_ms')},
+                       'candidates': [{key: value for key, value in result.items() if key not in ('estimator', 'sklearn_model')} for result in results]})
+
+        # The search's n_jobs would make every single-row predict of the pickle start a worker pool
+        model.n_jobs = None
+        # Save the trained model to a file
+        with open(MODEL_PATH, 'wb') as f:
+            pickle.dump(model, f)
+        print(f"Model saved to {MODEL_PATH}")
+
+    # Export the pickle-free compiled forest that app.py and web_app.py load
+    compiled.save(COMPILED_MODEL_PATH)
+    print(f"Compiled model saved to {COMPILED_MODEL_PATH}")
+    write_report(report, args.report)
 
-# Save the trained model to a file
-MODEL_PATH = './model.pkl'
-with open(MODEL_PATH, 'wb') as f:
-    pickle.dump(model, f)
 
-print(f"Model saved to {MODEL_PATH}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import argparse
+import functools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import mediapipe as mp
+
+from features import FeatureExtractor
+from forest import load_model
+from sentence import HandDecoders, SentenceBuilder
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# --- Per-Process Worker State ---
+# Each pool process loads the model once; MediaPipe trackers are created per chunk so
+# tracking state never carries over between unrelated clips.
+_model = None
+_extractor = None
+
+
+def _init_worker():
+    global _model, _extractor
+    _model = load_model()
+    _extractor = FeatureExtractor(_model.feature_schema, max_hands=2)
+
+
+# --- Work Planning ---
+def plan_chunks(source, chunk_frames, image_fps):
+    """Splits one video file or image directory into independently decodable frame ranges."""
+    if os.path.isdir(source):
+        images = sorted(os.path.join(source, name) for name in os.listdir(source) if name.lower().endswith(IMAGE_EXTENSIONS))
+        return [('images', source, images[start:start + chunk_frames], start, image_fps)
+                for start in range(0, len(images), chunk_frames)]
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        print(f"Error: could not open video '{source}'.")
+        return []
+    fps = cap.get(cv2.CAP_PROP_FPS) or image_fps
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    if frame_count <= 0:
+        # Unknown length (some containers/streams): decode the whole file in one chunk
+        return [('video', source, (0, None), 0, fps)]
+    return [('video', source, (start, min(start + chunk_frames, frame_count)), start, fps)
+            for start in range(0, frame_count, chunk_frames)]
+
+
+def _read_frames(kind, source, span):
+    if kind == 'images':
+        for path in span:
+            frame = cv2.imread(path)
+            if frame is not None:
+                yield frame
+        return
+
+    start, end = span
+    cap = cv2.VideoCapture(source)
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    index = start
+    while end is None or index < end:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        yield frame
+        index += 1
+    cap.release()
+
+
+def transcribe_chunk(chunk, flip=True):
+    """Decode + MediaPipe + classify one chunk. Returns (timestamp, handedness, predictions, probabilities) per frame."""
+    kind, source, span, first_frame, fps = chunk
+    hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=2, min_detection_confidence=0.5)
+    frames = []
+    try:
+        for offset, frame in enumerate(_read_frames(kind, source, span)):
+            if flip:
+                # Recordings are mirrored the same way as the live camera feed in app.py
+                frame = cv2.flip(frame, 1)
+            results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            handedness, predictions, probabilities = [], [], []
+            if results.multi_hand_landmarks:
+                handedness = [hand.classification[0].label for hand in results.multi_handedness]
+                probabilities = list(_model.predict_proba(_extractor.extract(results.multi_hand_landmarks)))
+                predictions = [str(_model.classes_[p.argmax()]) for p in probabilities]
+            frames.append(((first_frame + offset) / fps, handedness, predictions, probabilities))
+    finally:
+        hands.close()
+    return frames
+
+
+# --- Letter Commit Replay ---
+def build_transcript(source, frames, hold_duration, classes=None):
+    # With `classes`, the same per-hand streaming decoders as App.update_sentence; otherwise
+    # the older wall-clock hold, driven by frame timestamps instead of the clock
+    sentence = SentenceBuilder(hold_duration)
+    decoders = HandDecoders(classes) if classes is not None else None
+    letters = []
+    for timestamp, handedness, predictions, probabilities in frames:
+        if decoders is not None:
+            committed = [decoders.update(handedness, probabilities)]
+        else:
+            if not predictions:
+                sentence.reset_hold()
+            committed = [sentence.update(prediction, timestamp) for prediction in predictions]
+        for letter in committed:
+            if letter:
+                if decoders is not None:
+                    sentence.append(letter)
+                letters.append({'t': round(timestamp, 3), 'letter': letter.upper()})
+    return {
+        'source': source,
+        'frames': len(frames),
+        'duration_s': round(frames[-1][0], 3) if frames else 0.0,
+        'text': sentence.text.upper(),
+        'letters': letters,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe recorded sign videos or image folders to JSONL.")
+    parser.add_argument('inputs', nargs='+', help="video files and/or directories of frame images")
+    parser.add_argument('-o', '--output', default='transcripts.jsonl', help="JSONL file to write (one line per input)")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument('--chunk-frames', type=int, default=300, help="frames per work unit")
+    parser.add_argument('--decoder', choices=('smooth', 'hold'), default='smooth',
+                        help="streaming probability decoder (as in app.py) or the older wall-clock hold")
+    parser.add_argument('--hold', type=float, default=1.0, help="seconds a letter must be held to commit (--decoder hold)")
+    parser.add_argument('--image-fps', type=float, default=30.0, help="frame rate assumed for image folders")
+    parser.add_argument('--no-flip', action='store_true', help="do not mirror frames (use for already-mirrored recordings)")
+    args = parser.parse_args()
+
+    plans = [(source, plan_chunks(source, args.chunk_frames, args.image_fps)) for source in args.inputs]
+    chunks = [chunk for _, source_chunks in plans for chunk in source_chunks]
+    worker = functools.partial(transcribe_chunk, flip=not args.no_flip)
+    classes = load_model().classes_ if args.decoder == 'smooth' else None
+    print(f"Transcribing {len(args.inputs)} input(s) as {len(chunks)} chunk(s) on {args.workers} worker(s)...")
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as executor:
+        # map() keeps chunk order, so each source's frames come back in sequence
+        results = iter(executor.map(worker, chunks))
+        total_frames = 0
+        with open(args.output, 'w') as out:
+            for source, source_chunks in plans:
+                frames = [frame for _ in source_chunks for frame in next(results)]
+                total_frames += len(frames)
+                transcript = build_transcript(source, frames, args.hold, classes)
+                out.write(json.dumps(transcript) + "\n")
+                print(f"{source}: {transcript['frames']} frames -> '{transcript['text']}'")
+    elapsed = time.perf_counter() - started
+
+    print(f"Processed {total_frames} frames in {elapsed:.1f}s ({total_frames / max(elapsed, 1e-9):.1f} frames/s)")
+    print(f"Transcripts written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import importlib
+import threading
+import time
+
+# Reference point for start-up timings: the moment the entry script first imported this module
+PROCESS_STARTED = time.perf_counter()
+
+
+def since_start():
+    return time.perf_counter() - PROCESS_STARTED
+
+
+# --- Deferred Imports ---
+class LazyModule:
+    """
+    Stands in for a module that is imported on first attribute access, or by `load()` (e.g. from
+    a warm-up thread). Lets a window or server come up before OpenCV and MediaPipe have loaded.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+
+# --- Background Warm-Up ---
+class WarmUp(threading.Thread):
+    """
+    Runs slow start-up work in the background: `steps` are (description, callable) pairs run in
+    order. `status` names the step in progress, `finished` is set when all ran or one failed, and
+    `error` keeps the failure. `timings` has seconds per step, `seconds` the total since start-up.
+    `on_finished` is called on the warm-up thread right before `finished` is set.
+    """
+
+    def __init__(self, steps, on_finished=None):
+        super().__init__(name="WarmUp", daemon=True)
+        self.steps = list(steps)
+        self.status = "Waiting"
+        self.error = None
+        self.timings = {}
+        self.seconds = None
+        self.on_finished = on_finished
+        self.finished = threading.Event()
+
+    @property
+    def ready(self):
+        return self.finished.is_set() and self.error is None
+
+    def run(self):
+        try:
+            for description, step in self.steps:
+                self.status = description
+                started = time.perf_counter()
+                step()
+                self.timings[description] = time.perf_counter() - started
+            self.status = "Ready"
+        except Exception as e:
+            self.error = f"{self.status}: {e}"
+            self.status = "Failed"
+        self.seconds = since_start()
+        if self.error:
+            print(f"Error during warm-up: {self.error}")
+        else:
+            steps = ", ".join(f"{description} {seconds:.2f} s" for description, seconds in self.timings.items())
+            print(f"Ready {self.seconds:.2f} s after start-up ({steps}).")
+        if self.on_finished is not None:
+            self.on_finished()
+        self.finished.set()
+
+    def state(self):
+        return {
+            'ready': self.ready,
+            'status': self.status,
+            'error': self.error,
+            'seconds': round(self.seconds, 3) if self.seconds is not None else None,
+            'steps': {description: round(seconds, 3) for description, seconds in self.timings.items()},
+        }
@@ -1,29 +1,154 @@
+from warmup import LazyModule, WarmUp, since_start
 from flask import Flask, request, jsonify, render_template
 from flask_cors import CORS
+from flask_sock import Sock
 import numpy as np
-import cv2
 import base64
-import mediapipe as mp
-import pickle
+from forest import load_model
+from features import landmarks_to_features, points_to_features
+import os
+import time
+import threading
+import json
+import uuid
+from batching import MicroBatcher
+from prediction_cache import PredictionCache
+from hands_pool import HandsPool, PoolExhausted, SessionMap
+from sentence import StreamingDecoder
+from metrics import Registry, StageTimer
+
+# Imported by the warm-up thread, so the server is up before OpenCV and MediaPipe have loaded
+cv2 = LazyModule('cv2')
+mp = LazyModule('mediapipe')
 
 # Initialize Flask App
 app = Flask(__name__)
 CORS(app) # Allows the frontend (browser) to communicate with this backend
+sock = Sock(app) # Persistent WebSocket channel for streaming predictions
+
+# --- Operational Metrics (scraped from /metrics in Prometheus text format) ---
+# Setting TRACE_LOG also writes every stage duration of a TRACE_SAMPLE_RATE share of requests
+# to that file as JSON lines.
+# Only the stages that can take milliseconds (decode, mediapipe, predict) are timed, which keeps
+# the bookkeeping to a few microseconds per request.
+registry = Registry()
+stage_seconds = registry.histogram('asl_stage_seconds', 'Time spent in each request stage', ['stage'])
+request_seconds = registry.histogram('asl_request_seconds', 'Server time per prediction request', ['mode'])
+requests_total = registry.counter('asl_requests_total', 'Prediction requests by mode, transport and outcome', ['mode', 'transport', 'outcome'])
+requests_in_flight = registry.gauge('asl_requests_in_flight', 'Prediction requests being processed', ['transport'])
+websocket_connections = registry.gauge('asl_websocket_connections', 'Open WebSocket connections')
+model_loaded = registry.gauge('asl_model_loaded', 'Whether a model is loaded')
+model_load_seconds = registry.gauge('asl_model_load_seconds', 'Time it took to load the model')
+warmup_seconds = registry.gauge('asl_warmup_seconds', 'Seconds from start-up until the server was ready')
+first_prediction_seconds = registry.gauge('asl_first_prediction_seconds', 'Seconds from start-up until the first prediction')
+timer = StageTimer(stage_seconds, os.environ.get('TRACE_LOG'), float(os.environ.get('TRACE_SAMPLE_RATE', 0.01)))
+
+# --- Model (loaded by the warm-up thread, see below) ---
+model = None
+model_loaded.set(0)
+
+# --- Micro-Batching Settings ---
+# Requests arriving within BATCH_MAX_WAIT_MS of each other share one predict_proba call
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 32))
+BATCH_MAX_WAIT_MS = float(os.environ.get('BATCH_MAX_WAIT_MS', 5))
+
+# --- Prediction Cache ---
+# Held signs send near-identical landmarks frame after frame; those reuse earlier probabilities
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 4096))
+PREDICTION_CACHE_TOLERANCE = float(os.environ.get('PREDICTION_CACHE_TOLERANCE', 0.005))
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TOLERANCE) if PREDICTION_CACHE_SIZE > 0 else None
+
+# Built together with the model by the warm-up thread
+batcher = None
+
+# --- Per-Mode Request Statistics ---
+# 'image' is the base64 JPEG path, 'landmarks' the client-side extraction path
+mode_stats = {mode: {'requests': 0, 'request_bytes': 0, 'server_time': 0.0} for mode in ('image', 'landmarks')}
+mode_stats_lock = threading.Lock()
+first_prediction_at = None
+
+def record_request(mode, started, request_bytes, transport, result):
+    global first_prediction_at
+    elapsed = time.perf_counter() - started
+    with mode_stats_lock:
+        stats = mode_stats[mode]
+        stats['requests'] += 1
+        stats['request_bytes'] += request_bytes or 0
+        stats['server_time'] += elapsed
+    outcome = 'ok' if result['prediction'] else 'no_hand'
+    request_seconds.observe(elapsed, mode)
+    requests_total.inc(mode, transport, outcome)
+    timer.end(mode=mode, transport=transport, outcome=outcome, server_ms=round(elapsed * 1000.0, 3))
+    if first_prediction_at is None and outcome == 'ok':
+        first_prediction_at = since_start()
+        first_prediction_seconds.set(first_prediction_at)
+    return elapsed * 1000.0
+
+def record_failure(mode, transport, outcome):
+    requests_total.inc(mode, transport, outcome)
+    timer.end(mode=mode, transport=transport, outcome=outcome)
+
+# --- Per-Session Hand Trackers ---
+# Every browser session gets its own tracker so temporal tracking stays coherent per user,
+# and different sessions can be processed in parallel by the threaded server. With several
+# worker processes (e.g. gunicorn -w N --threads M) each process keeps its own pool, so route
+# a session to the same worker (sticky sessions) to keep its tracking state.
+HANDS_POOL_SIZE = int(os.environ.get('HANDS_POOL_SIZE', 32))
+HANDS_IDLE_TIMEOUT = float(os.environ.get('HANDS_IDLE_TIMEOUT', 120))
+
+def create_hands():
+    # For the web app, we process one hand at a time
+    return mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=1, min_detection_confidence=0.5)
+
+hands_pool = HandsPool(create_hands, max_sessions=HANDS_POOL_SIZE, idle_timeout=HANDS_IDLE_TIMEOUT)
+
+# Each session also gets a streaming decoder that turns its frames into committed letters.
+# Decoders are a few KB and landmark-only clients never hold a tracker, so they are kept in
+# their own map: expired after the same idle timeout, and capped only at DECODER_SESSIONS.
+DECODER_SESSIONS = int(os.environ.get('DECODER_SESSIONS', 4096))
+
+def create_decoder():
+    return StreamingDecoder(model.classes_)
+
+decoder_sessions = SessionMap(create_decoder, max_sessions=DECODER_SESSIONS, idle_timeout=HANDS_IDLE_TIMEOUT)
 
-# --- Load Your Model and Hand Tracking Utilities ---
-# This logic is copied from your desktop app's setup
-try:
-    model = pickle.load(open('model.pkl', 'rb'))
-except FileNotFoundError:
-    print("Error: 'model.pkl' not found. Please train the model first.")
-    model = None
-except Exception as e:
-    print(f"An error occurred while loading the model: {e}")
-    model = None
-
-mp_hands = mp.solutions.hands
-# For the web app, we process one hand at a time
-hands = mp_hands.Hands(static_image_mode=False, max_num_hands=1, min_detection_confidence=0.5)
+# --- Background Warm-Up ---
+# The server answers right away; /ready and the prediction endpoints return 503 until the model
+# is loaded and MediaPipe has built its first tracker.
+def load_model_and_batcher():
+    global model, batcher
+    load_started = time.perf_counter()
+    # Prefers the compiled model.npz, falls back to the sklearn pickle
+    loaded = load_model()
+    model_load_seconds.set(time.perf_counter() - load_started)
+    batcher = MicroBatcher(loaded, max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS, cache=prediction_cache)
+    model = loaded
+    model_loaded.set(1)
+
+def start_mediapipe():
+    # Builds and drops one tracker, so the first session doesn't pay for MediaPipe's start-up
+    cv2.load()
+    create_hands().close()
+
+warm_up = WarmUp([
+    ("Loading model", load_model_and_batcher),
+    ("Loading OpenCV and MediaPipe", start_mediapipe),
+], on_finished=lambda: warmup_seconds.set(warm_up.seconds))
+
+def not_ready_response():
+    if warm_up.error:
+        return jsonify({'error': warm_up.error}), 500
+    return jsonify({'error': f'Warming up: {warm_up.status}'}), 503, {'Retry-After': '1'}
+
+@app.route('/ready')
+def readiness():
+    state = warm_up.state()
+    state['first_prediction_seconds'] = round(first_prediction_at, 3) if first_prediction_at is not None else None
+    return jsonify(state), 200 if warm_up.ready else 503
+
+def session_id():
+    # The frontend sends a per-tab id; fall back to the client address for plain API callers
+    return request.headers.get('X-Session-ID') or request.remote_addr
 
 # --- Define the Main Page Route ---
 @app.route('/')
@@ -31,44 +156,243 @@ def index():
     # This will render the index.html file from the 'templates' folder
     return render_template('index.html')
 
+# --- Shared Prediction Helpers (used by the HTTP and WebSocket transports) ---
+def decode_image(data_url):
+    # The image is sent as a Data URL (e.g., "data:image/jpeg;base64,....")
+    # We need to strip the header and decode the base64 string
+    try:
+        with timer.stage('decode'):
+            image_data = data_url.split(',')[1]
+            decoded_image = base64.b64decode(image_data)
+            np_arr = np.frombuffer(decoded_image, np.uint8)
+            frame = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+    except Exception as e:
+        raise ValueError(f'Image decoding failed: {e}')
+    if frame is None:
+        raise ValueError('Image decoding failed: not a valid image')
+    return frame
+
+def predict_image(frame, sid):
+    # --- Process the Image (The "Brain" of the App) ---
+    with hands_pool.acquire(sid) as hands, timer.stage('mediapipe'):
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = hands.process(rgb_frame)
+
+    if not results.multi_hand_landmarks:
+        return None
+    landmarks = landmarks_to_features(results.multi_hand_landmarks[0], model.feature_schema)
+
+    # Get the model's class probabilities, batched together with concurrent requests
+    with timer.stage('predict'):
+        return batcher.predict_proba(landmarks)
+
+# The browser runs MediaPipe itself and sends the 21 normalized points, either as
+# JSON ({"landmarks": [x0, y0, z0, x1, y1, z1, ...]}) or as raw little-endian float32 bytes.
+# (x, y) pairs are accepted as well, for models whose feature schema has no z. An empty payload means the hand left the frame.
+def parse_landmark_values(values):
+    try:
+        values = np.asarray(values, dtype=np.float32).reshape(-1)
+    except TypeError as e:
+        # e.g. an object or nested non-numeric values instead of a flat list of numbers
+        raise ValueError(f'Invalid landmark payload: {e}')
+    if not np.isfinite(values).all():
+        raise ValueError('Invalid landmark payload: values must be finite numbers')
+    if values.size == 0:
+        return None
+    if values.size not in (42, 63):
+        raise ValueError(f'Invalid landmark payload: expected 21 (x, y) or (x, y, z) points, got {values.size} values')
+    return values.reshape(21, -1)
+
+def predict_points(points):
+    if points is None:
+        return None
+    # Same features the image path computes on the server
+    landmarks = points_to_features(points, model.feature_schema)
+    with timer.stage('predict'):
+        return batcher.predict_proba(landmarks)
+
+def decode_result(sid, proba):
+    # The raw per-frame label plus the letter (if any) the session's decoder commits on this frame
+    with decoder_sessions.acquire(sid) as decoder:
+        if proba is None:
+            decoder.reset()
+            return {'prediction': '', 'confidence': 0.0, 'committed': ''}
+        letter = decoder.update(proba)
+        confidence = decoder.confidence
+    prediction = model.classes_[int(np.argmax(proba))]
+    return {'prediction': prediction.upper(), 'confidence': confidence, 'committed': (letter or '').upper()}
+
 # --- Create the Prediction API Endpoint ---
 @app.route('/predict', methods=['POST'])
 def predict():
-    if not model:
-        return jsonify({'error': 'Model not loaded'}), 500
+    started = time.perf_counter()
+    if not warm_up.ready:
+        return not_ready_response()
 
     # Receive the image data from the frontend
-    data = request.get_json()
-    # The image is sent as a Data URL (e.g., "data:image/jpeg;base64,....")
-    # We need to strip the header and decode the base64 string
-    image_data = data['image'].split(',')[1] 
-    
+    data = request.get_json(force=True, silent=True)
     try:
-        # Decode the image
-        decoded_image = base64.b64decode(image_data)
-        np_arr = np.frombuffer(decoded_image, np.uint8)
-        frame = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-    except Exception as e:
-        return jsonify({'error': f'Image decoding failed: {e}'}), 400
+        if not isinstance(data, dict) or 'image' not in data:
+            raise ValueError('Invalid request: expected a JSON object with an "image" field')
+        frame = decode_image(data['image'])
+        sid = session_id()
+        result = decode_result(sid, predict_image(frame, sid))
+    except ValueError as e:
+        record_failure('image', 'http', 'invalid')
+        return jsonify({'error': str(e)}), 400
+    except PoolExhausted as e:
+        record_failure('image', 'http', 'busy')
+        return jsonify({'error': str(e)}), 503
 
-    # --- Process the Image (The "Brain" of the App) ---
-    prediction = ""
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = hands.process(rgb_frame)
-
-    if results.multi_hand_landmarks:
-        hand_landmarks = results.multi_hand_landmarks[0]
-        landmarks = []
-        base_x, base_y = hand_landmarks.landmark[0].x, hand_landmarks.landmark[0].y
-        for lm in hand_landmarks.landmark:
-            landmarks.extend([lm.x - base_x, lm.y - base_y])
-        
-        # Get the model's prediction
-        prediction = model.predict(np.array(landmarks).reshape(1, -1))[0]
-    
     # Return the prediction to the frontend as a JSON object
-    return jsonify({'prediction': prediction.upper()})
+    result['server_ms'] = record_request('image', started, request.content_length, 'http', result)
+    return jsonify(result)
+
+# --- Client-Side Landmark Endpoint ---
+# Send either JSON or raw float32 bytes with Content-Type: application/octet-stream
+@app.route('/predict_landmarks', methods=['POST'])
+def predict_landmarks():
+    started = time.perf_counter()
+    if not warm_up.ready:
+        return not_ready_response()
+
+    try:
+        if request.mimetype == 'application/octet-stream':
+            points = parse_landmark_values(np.frombuffer(request.get_data(), dtype='<f4'))
+        else:
+            # Only an empty body means the hand left; anything else has to parse
+            data = request.get_json(force=True, silent=True) if request.get_data() else {}
+            if not isinstance(data, dict):
+                raise ValueError('Invalid landmark payload: expected a JSON object')
+            points = parse_landmark_values(data.get('landmarks', []))
+        result = decode_result(session_id(), predict_points(points))
+    except ValueError as e:
+        record_failure('landmarks', 'http', 'invalid')
+        return jsonify({'error': str(e)}), 400
+    except PoolExhausted as e:
+        record_failure('landmarks', 'http', 'busy')
+        return jsonify({'error': str(e)}), 503
+
+    result['server_ms'] = record_request('landmarks', started, request.content_length, 'http', result)
+    return jsonify(result)
+
+# --- Streaming WebSocket Endpoint ---
+# One persistent connection per browser tab. Each message is one frame: a binary message
+# is float32 landmarks, a text message is JSON with either "image" or "landmarks". Every
+# frame gets exactly one JSON reply, pushed as soon as it is ready, so the client can
+# bound its frames in flight and never queue more work than the server keeps up with.
+@sock.route('/ws')
+def prediction_stream(ws):
+    if not warm_up.ready:
+        ws.send(json.dumps({'error': warm_up.error or f'Warming up: {warm_up.status}'}))
+        return
+    sid = request.args.get('session') or str(uuid.uuid4())
+
+    with websocket_connections.track():
+        while True:
+            message = ws.receive()
+            started = time.perf_counter()
+            timer.begin()
+            mode = 'landmarks'
+            try:
+                with requests_in_flight.track('websocket'):
+                    if isinstance(message, bytes):
+                        proba = predict_points(parse_landmark_values(np.frombuffer(message, dtype='<f4')))
+                    else:
+                        data = json.loads(message)
+                        if not isinstance(data, dict):
+                            raise ValueError('Invalid message: expected a JSON object')
+                        if 'image' in data:
+                            mode = 'image'
+                            proba = predict_image(decode_image(data['image']), sid)
+                        else:
+                            proba = predict_points(parse_landmark_values(data.get('landmarks', [])))
+                    result = decode_result(sid, proba)
+            except (ValueError, PoolExhausted) as e:
+                record_failure(mode, 'websocket', 'busy' if isinstance(e, PoolExhausted) else 'invalid')
+                ws.send(json.dumps({'error': str(e)}))
+                continue
+
+            result['server_ms'] = record_request(mode, started, len(message), 'websocket', result)
+            ws.send(json.dumps(result))
+
+# --- HTTP Request Bookkeeping For The Prediction Endpoints ---
+PREDICTION_ENDPOINTS = ('predict', 'predict_landmarks')
+
+@app.before_request
+def begin_prediction_request():
+    if request.endpoint in PREDICTION_ENDPOINTS:
+        requests_in_flight.inc('http')
+        timer.begin()
+
+@app.teardown_request
+def end_prediction_request(exc):
+    if request.endpoint in PREDICTION_ENDPOINTS:
+        requests_in_flight.dec('http')
+
+# --- Prometheus Metrics ---
+# Pool, batcher and cache figures are read at scrape time, so requests pay nothing for them
+active_sessions = registry.gauge('asl_tracker_sessions', 'Sessions holding a hand tracker')
+batch_pending = registry.gauge('asl_batch_pending', 'Feature vectors waiting for the next batch')
+batch_mean_size = registry.gauge('asl_batch_mean_size', 'Mean rows per predict_proba batch')
+cache_lookups = registry.gauge('asl_prediction_cache_lookups', 'Prediction cache lookups since start', ['result'])
+
+def collect_component_stats():
+    active_sessions.set(hands_pool.stats()['sessions'])
+    if batcher:
+        stats = batcher.stats()
+        batch_pending.set(stats['pending'])
+        batch_mean_size.set(stats['mean_batch_size'])
+    if prediction_cache:
+        stats = prediction_cache.stats()
+        cache_lookups.set(stats['hits'], 'hit')
+        cache_lookups.set(stats['misses'], 'miss')
+
+registry.collectors.append(collect_component_stats)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    return registry.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+# --- Micro-Batching Statistics ---
+@app.route('/stats/batching')
+def batching_stats():
+    if not warm_up.ready:
+        return not_ready_response()
+    return jsonify(batcher.stats())
+
+@app.route('/stats/cache')
+def cache_stats():
+    if not prediction_cache:
+        return jsonify({'error': 'Prediction cache disabled'}), 404
+    return jsonify(prediction_cache.stats())
+
+@app.route('/stats/modes')
+def request_mode_stats():
+    with mode_stats_lock:
+        report = {}
+        for mode, stats in mode_stats.items():
+            count = max(stats['requests'], 1)
+            report[mode] = {
+                'requests': stats['requests'],
+                'mean_request_bytes': stats['request_bytes'] / count,
+                'mean_server_ms': stats['server_time'] * 1000.0 / count,
+            }
+    return jsonify(report)
+
+@app.route('/stats/sessions')
+def session_stats():
+    return jsonify(hands_pool.stats())
+
+@app.route('/stats/decoders')
+def decoder_stats():
+    return jsonify(decoder_sessions.stats())
+
+# With the debug reloader, `python web_app.py` runs a watcher process that never serves requests
+# next to the actual server (marked by WERKZEUG_RUN_MAIN); only the server warms up.
+if __name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN'):
+    warm_up.start()
 
 if __name__ == '__main__':
     # Run the server on localhost, port 5000
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True, threaded=True)
\ No newline at end of file